@@ -0,0 +1,158 @@
+from __future__ import unicode_literals
+
+from weakref import WeakKeyDictionary
+
+from django.test.signals import setting_changed
+from rest_framework.exceptions import ValidationError
+
+from .settings import friendly_settings
+
+_MISSING = object()
+
+
+def collect_class_setting(klass, name):
+    """
+    Merges dict class attributes called `name` along the class MRO, so
+    subclasses extend the codes registered by their bases.
+    """
+    merged = {}
+    for base in reversed(klass.__mro__):
+        merged.update(vars(base).get(name) or {})
+    return merged
+
+
+_field_error_codes = {}
+
+
+def get_field_error_codes(field_class):
+    """
+    Returns `FRIENDLY_FIELD_ERRORS` codes for `field_class`, merged along
+    its MRO so that subclasses of built-in fields inherit their codes.
+    """
+    try:
+        return _field_error_codes[field_class]
+    except KeyError:
+        pass
+    codes = {}
+    for klass in reversed(field_class.__mro__):
+        codes.update(friendly_settings.FRIENDLY_FIELD_ERRORS.get(
+            klass.__name__, {}))
+    _field_error_codes[field_class] = codes
+    return codes
+
+
+_exception_codes = WeakKeyDictionary()
+
+
+def get_exception_code(exc_class, match_name=True):
+    """
+    Returns the `FRIENDLY_EXCEPTION_DICT` code of `exc_class`. Entries keyed
+    by class or dotted path are matched along the class MRO, so subclasses
+    inherit the code of their closest base. Entries keyed by class name only
+    match `exc_class` itself, and are skipped unless `match_name` is set.
+    """
+    codes = _exception_codes.setdefault(exc_class, {})
+    try:
+        return codes[match_name]
+    except KeyError:
+        pass
+    # User entries come first so that a class name set in the settings
+    # overrides the dotted path of a default entry.
+    tables = (friendly_settings.USER_EXCEPTION_DICT,
+              friendly_settings.FRIENDLY_EXCEPTION_DICT)
+    code = None
+    for klass in exc_class.__mro__:
+        keys = (klass, '%s.%s' % (klass.__module__, klass.__qualname__))
+        if match_name and klass is exc_class:
+            keys += (klass.__name__,)
+        code = find_exception_code(tables, keys)
+        if code is not None:
+            break
+    codes[match_name] = code
+    return code
+
+
+def find_exception_code(tables, keys):
+    for exception_codes in tables:
+        for key in keys:
+            code = exception_codes.get(key)
+            if code is not None:
+                return code
+    return None
+
+
+class ErrorCodeTable(object):
+    """
+    Error codes of a single serializer class. Entries are resolved on first
+    use and then served from a flat dict shared by all class instances.
+    """
+
+    def __init__(self, serializer_class):
+        self.field_validation_errors = collect_class_setting(
+            serializer_class, 'FIELD_VALIDATION_ERRORS')
+        self.non_field_errors = collect_class_setting(
+            serializer_class, 'NON_FIELD_ERRORS')
+        self.codes = {}
+
+    def field_code(self, field, key):
+        entry = (field.field_name, field.__class__, key)
+        code = self.codes.get(entry, _MISSING)
+        if code is _MISSING:
+            field_errors = get_field_error_codes(field.__class__)
+            code = self.codes[entry] = field_errors.get(key)
+        return code
+
+    def validator_code(self, name):
+        entry = (None, None, name)
+        code = self.codes.get(entry, _MISSING)
+        if code is _MISSING:
+            code = self.codes[entry] = \
+                self.field_validation_errors.get(name) \
+                or friendly_settings.FRIENDLY_VALIDATOR_ERRORS.get(name)
+        return code
+
+    def field_name_code(self, field_name):
+        return self.field_validation_errors.get(field_name)
+
+    def non_field_code(self, message, code=None):
+        """
+        Resolves a non-field error by its `ErrorDetail.code` first, so
+        translated messages keep their codes. Message keys are only used
+        as a fallback, and the raw code is returned when nothing matches.
+        The generic `ValidationError` code is never looked up, so an
+        unmapped error keeps it instead of picking up the `'invalid'` entry
+        of `FRIENDLY_NON_FIELD_ERRORS`.
+        """
+        keys = (message,) if code == ValidationError.default_code \
+            else (code, message)
+        for errors in (self.non_field_errors,
+                       friendly_settings.FRIENDLY_NON_FIELD_ERRORS):
+            for key in keys:
+                if key is not None and key in errors:
+                    return errors[key]
+        return code
+
+
+_tables = WeakKeyDictionary()
+
+
+def get_error_code_table(serializer_class):
+    try:
+        return _tables[serializer_class]
+    except KeyError:
+        table = _tables[serializer_class] = ErrorCodeTable(serializer_class)
+        return table
+
+
+def clear_error_code_tables():
+    _tables.clear()
+    _field_error_codes.clear()
+    _exception_codes.clear()
+
+
+def clear_error_codes_on_change(*args, **kwargs):
+    if kwargs['setting'] == 'FRIENDLY_ERRORS':
+        clear_error_code_tables()
+
+
+setting_changed.connect(clear_error_codes_on_change)
@@ -0,0 +1,39 @@
+from __future__ import unicode_literals
+
+ERROR_KEYS = ('code', 'field', 'message', 'meta')
+DEFAULT_KEYS = ERROR_KEYS[:3]
+# Keys of entries in compact responses, which carry no messages
+COMPACT_KEYS = ERROR_KEYS[:2]
+
+
+def error_entry(code, field, message, meta=None):
+    """
+    Returns a friendly error entry. Entries are plain dicts, built once per
+    error and rendered as they are; `meta` is only set when given.
+    """
+    if meta is None:
+        return {'code': code, 'field': field, 'message': message}
+    return {'code': code, 'field': field, 'message': message, 'meta': meta}
+
+
+def with_field(entry, field):
+    """
+    Returns a copy of `entry` reported under `field`.
+    """
+    return dict(entry, field=field)
+
+
+def as_compact(entry):
+    return {key: value for key, value in entry.items() if key != 'message'}
+
+
+def as_compact_errors(pretty_errors):
+    """
+    Returns `pretty_errors` without the top level message and the messages
+    of its entries.
+    """
+    compact = {key: value for key, value in pretty_errors.items()
+               if key != 'message'}
+    compact['errors'] = [as_compact(error)
+                         for error in pretty_errors['errors']]
+    return compact
@@ -1,32 +1,315 @@
 from __future__ import unicode_literals
 
+import re
+from collections import namedtuple
+from functools import lru_cache, partial
+from string import Formatter
+from types import MappingProxyType
+
+from django.conf import settings as dj_settings
+from django.utils import timezone, translation
+from rest_framework import fields, relations, serializers
+
+TIME_FORMAT = 'hh:mm[:ss[.uuuuuu]]'
+DATE_FORMAT = 'YYYY[-MM[-DD]]'
+DATETIME_FORMAT = 'YYYY-MM-DDThh:mm[:ss[.uuuuuu]][+HH:MM|-HH:MM|Z]'
+DURATION_FORMAT = '[DD] [HH:[MM:]]ss[.uuuuuu]'
+
+
+def get_current_timezone():
+    return timezone.get_current_timezone() if dj_settings.USE_TZ else None
+
+
+def no_kwargs(field, *args):
+    return {}
+
+
+def input_kwargs(field, field_data):
+    return {'input': field_data}
+
+
+def length_kwargs(field):
+    return {'max_length': getattr(field, 'max_length', None),
+            'min_length': getattr(field, 'min_length', None)}
+
+
+def value_kwargs(field, field_data):
+    return {'value': field_data}
+
+
+def numeric_kwargs(field):
+    kwargs = {'min_value': field.min_value,
+              'max_value': field.max_value,
+              'decimal_places': getattr(field, 'decimal_places', None),
+              'max_decimal_places': getattr(field, 'decimal_places', None),
+              'max_digits': getattr(field, 'max_digits', None)}
+    max_digits = kwargs['max_digits']
+    decimal_places = kwargs['decimal_places']
+    if max_digits is not None and decimal_places is not None:
+        kwargs['max_whole_digits'] = max_digits - decimal_places
+    return kwargs
+
+
+def date_kwargs(date_format, field):
+    kwargs = {'format': date_format}
+    if 'timezone' in field.__dict__:
+        kwargs['timezone'] = field.timezone
+    return kwargs
+
+
+def date_timezone_kwargs(field, field_data):
+    if 'timezone' in field.__dict__:
+        return {}
+    return {'timezone': get_current_timezone()}
+
+
+def choice_kwargs(field, field_data):
+    return {'input': field_data,
+            'input_type': type(field_data).__name__}
+
+
+def file_static_kwargs(field):
+    return {'max_length': field.max_length}
+
+
+def file_kwargs(field, field_data):
+    """
+    Upload metadata is read from `UploadedFile.name` and `.size`, the
+    upload body is never read or measured. `length` is the length of the
+    file name, as in DRF's `max_length` message.
+    """
+    name = getattr(field_data, 'name', None)
+    if name is None and isinstance(field_data, str):
+        name = field_data
+    return {'name': name,
+            'length': len(name) if name is not None else None,
+            'size': getattr(field_data, 'size', None)}
+
+
+def input_type_kwargs(field, field_data):
+    return {'input_type': type(field_data).__name__}
+
+
+def relation_static_kwargs(field):
+    return {'slug_name': getattr(field, 'slug_field', None)}
+
+
+def relation_kwargs(field, field_data):
+    return {'pk_value': field_data,
+            'input_type': type(field_data).__name__,
+            'value': field_data}
+
+
+def max_length_kwargs(field):
+    return {'max_length': getattr(field, 'max_length', None)}
+
+
+# `static_kwargs` depend only on the field instance and are computed once
+# per bound field, `kwargs` depend on the submitted value.
+FieldCategory = namedtuple('FieldCategory',
+                           ['name', 'static_kwargs', 'kwargs'])
+
+BOOLEAN = FieldCategory('boolean', no_kwargs, input_kwargs)
+STRING = FieldCategory('string', length_kwargs, value_kwargs)
+NUMERIC = FieldCategory('numeric', numeric_kwargs, no_kwargs)
+DATETIME = FieldCategory('date', partial(date_kwargs, DATETIME_FORMAT),
+                         date_timezone_kwargs)
+DATE = FieldCategory('date', partial(date_kwargs, DATE_FORMAT),
+                     date_timezone_kwargs)
+TIME = FieldCategory('date', partial(date_kwargs, TIME_FORMAT),
+                     date_timezone_kwargs)
+DURATION = FieldCategory('date', partial(date_kwargs, DURATION_FORMAT),
+                         date_timezone_kwargs)
+CHOICE = FieldCategory('choice', no_kwargs, choice_kwargs)
+FILE = FieldCategory('file', file_static_kwargs, file_kwargs)
+COMPOSITE = FieldCategory('composite', length_kwargs, input_type_kwargs)
+RELATION = FieldCategory('relation', relation_static_kwargs, relation_kwargs)
+SERIALIZER = FieldCategory('serializer', relation_static_kwargs,
+                           relation_kwargs)
+MISCELLANEOUS = FieldCategory('miscellaneous', max_length_kwargs, no_kwargs)
+
+
+def _build_registry(entries):
+    registry = {}
+    for class_name, category in entries:
+        for module in (fields, relations, serializers):
+            field_class = getattr(module, class_name, None)
+            if field_class is not None:
+                registry[field_class] = category
+                break
+    return MappingProxyType(registry)
+
+
+# Field classes which are not available in the installed DRF version
+# (e.g. `NullBooleanField`) are skipped.
+FIELD_REGISTRY = _build_registry([
+    ('BooleanField', BOOLEAN),
+    ('NullBooleanField', BOOLEAN),
+    ('CharField', STRING),
+    ('EmailField', STRING),
+    ('RegexField', STRING),
+    ('SlugField', STRING),
+    ('URLField', STRING),
+    ('UUIDField', STRING),
+    ('FilePathField', STRING),
+    ('IPAddressField', STRING),
+    ('IntegerField', NUMERIC),
+    ('FloatField', NUMERIC),
+    ('DecimalField', NUMERIC),
+    ('DateTimeField', DATETIME),
+    ('DateField', DATE),
+    ('TimeField', TIME),
+    ('DurationField', DURATION),
+    ('ChoiceField', CHOICE),
+    ('MultipleChoiceField', CHOICE),
+    ('FileField', FILE),
+    ('ImageField', FILE),
+    ('ListField', COMPOSITE),
+    ('DictField', COMPOSITE),
+    ('JSONField', COMPOSITE),
+    ('StringRelatedField', RELATION),
+    ('RelatedField', RELATION),
+    ('PrimaryKeyRelatedField', RELATION),
+    ('HyperlinkedRelatedField', RELATION),
+    ('SlugRelatedField', RELATION),
+    ('HyperlinkedIdentityField', RELATION),
+    ('ManyRelatedField', RELATION),
+    ('ListSerializer', SERIALIZER),
+    ('ReadOnlyField', MISCELLANEOUS),
+    ('HiddenField', MISCELLANEOUS),
+    ('ModelField', MISCELLANEOUS),
+    ('SerializerMethodField', MISCELLANEOUS),
+])
+
+_field_categories = {}
+
+
+def get_field_category(field_class):
+    """
+    Returns the category of `field_class`, resolved along its MRO so that
+    subclasses of built-in fields share their parent's handling.
+    """
+    try:
+        return _field_categories[field_class]
+    except KeyError:
+        pass
+    category = MISCELLANEOUS
+    for klass in field_class.__mro__:
+        if klass in FIELD_REGISTRY:
+            category = FIELD_REGISTRY[klass]
+            break
+    _field_categories[field_class] = category
+    return category
+
+
+class MessageIndex(object):
+    """
+    Reverse index of `error_messages`: placeholder-free messages are looked
+    up by hash, templates with placeholders are compiled into regexes.
+    """
+
+    def __init__(self, error_messages):
+        self.exact = {}
+        self.patterns = []
+        for key, template in error_messages.items():
+            template = str(template)
+            try:
+                chunks = list(Formatter().parse(template))
+            except ValueError:
+                continue
+            if all(name is None for _, name, _, _ in chunks):
+                self.exact.setdefault(template, key)
+                continue
+            pattern, names = [], set()
+            for literal, name, _, _ in chunks:
+                pattern.append(re.escape(literal))
+                if name is None:
+                    continue
+                if name.isidentifier() and name not in names:
+                    names.add(name)
+                    pattern.append('(?P<%s>.*?)' % name)
+                else:
+                    pattern.append('.*?')
+            self.patterns.append((key, re.compile(''.join(pattern) + r'\Z',
+                                                  re.DOTALL)))
+
+    def find(self, message):
+        """
+        Returns `(key, params)` candidates which could have produced
+        `message`, in `error_messages` order.
+        """
+        key = self.exact.get(message)
+        if key is not None:
+            return ((key, {}),)
+        candidates = []
+        for key, pattern in self.patterns:
+            match = pattern.match(message)
+            if match is not None:
+                candidates.append((key, match.groupdict()))
+        return tuple(candidates)
+
+
+_class_message_indexes = {}
+
+
+def get_message_index(field):
+    """
+    Returns the index of `field.error_messages` for the active language.
+    Fields using default messages share one index per field class, fields
+    with custom `error_messages` get their own.
+    """
+    language = translation.get_language()
+    if has_custom_messages(field):
+        indexes = field.__dict__.setdefault('_friendly_message_indexes', {})
+    else:
+        indexes = _class_message_indexes.setdefault(field.__class__, {})
+    index = indexes.get(language)
+    if index is None:
+        index = indexes[language] = MessageIndex(field.error_messages)
+    return index
+
+
+def has_custom_messages(field):
+    return 'error_messages' in getattr(field, '_kwargs', {})
+
+
+@lru_cache(maxsize=2048)
+def _find_class_message(field_class, language, message):
+    return _class_message_indexes[field_class][language].find(message)
+
+
+def find_message_candidates(field, message):
+    """
+    Matches `message` against the field's message index. Lookups for
+    fields using default messages go through a bounded LRU cache, so
+    repeated identical failures are resolved without matching again.
+    """
+    message = str(message)
+    index = get_message_index(field)
+    if has_custom_messages(field):
+        return index.find(message)
+    return _find_class_message(field.__class__, translation.get_language(),
+                               message)
+
 
 class FieldMap(object):
-    TIME_FORMAT = 'hh:mm[:ss[.uuuuuu]]'
-    DATE_FORMAT = 'YYYY[-MM[-DD]]'
-    DATETIME_FORMAT = 'YYYY-MM-DDThh:mm[:ss[.uuuuuu]][+HH:MM|-HH:MM|Z]'
-    DURATION_FORMAT = '[DD] [HH:[MM:]]ss[.uuuuuu]'
-
-    @property
-    def field_map(self):
-        return {
-            'boolean': ['BooleanField', 'NullBooleanField'],
-            'string': ['CharField', 'EmailField', 'RegexField', 'SlugField',
-                       'URLField', 'UUIDField', 'FilePathField',
-                       'IPAddressField'],
-            'numeric': ['IntegerField', 'FloatField', 'DecimalField'],
-            'date': {'DateTimeField': self.DATETIME_FORMAT,
-                     'DateField': self.DATE_FORMAT,
-                     'TimeField': self.TIME_FORMAT,
-                     'DurationField': self.DURATION_FORMAT},
-            'choice': ['ChoiceField', 'MultipleChoiceField'],
-            'file': ['FileField', 'ImageField'],
-            'composite': ['ListField', 'DictField', 'JSONField'],
-            'relation': ['StringRelatedField', 'PrimaryKeyRelatedField',
-                         'HyperlinkedRelatedField', 'SlugRelatedField',
-                         'HyperlinkedIdentityField', 'ManyRelatedField'
-                         'CitixenPrimaryKeyRelatedField', 'CitixenGroupPermissionRelatedField'],
-            'serializer': ['ListSerializer'],
-            'miscellaneous': ['ReadOnlyField', 'HiddenField', 'ModelField',
-                              'SerializerMethodField']
-        }
+    TIME_FORMAT = TIME_FORMAT
+    DATE_FORMAT = DATE_FORMAT
+    DATETIME_FORMAT = DATETIME_FORMAT
+    DURATION_FORMAT = DURATION_FORMAT
+
+    def get_field_kwargs(self, field, field_data):
+        category = get_field_category(field.__class__)
+        static_kwargs = field.__dict__.get('_friendly_static_kwargs')
+        if static_kwargs is None:
+            static_kwargs = category.static_kwargs(field)
+            field._friendly_static_kwargs = static_kwargs
+        kwargs = dict(static_kwargs,
+                      data_type=type(field_data).__name__,
+                      datatype=type(field_data).__name__)
+        kwargs.update(category.kwargs(field, field_data))
+        return kwargs
+
+    @staticmethod
+    def _timezone():
+        return get_current_timezone()
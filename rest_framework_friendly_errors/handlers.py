@@ -1,29 +1,106 @@
-from rest_framework.exceptions import APIException
-from rest_framework.views import exception_handler
+from django.core.exceptions import PermissionDenied
+from django.http import Http404
+from rest_framework import exceptions
+from rest_framework.response import Response
+from rest_framework.views import set_rollback
 
-from . import settings
-from .utils import is_pretty
+from . import instrumentation
+from .codes import get_exception_code
+from .errors import as_compact_errors
+from .messages import get_message
+from .responses import (
+    PrebuiltBodyResponse, build_detail_body, compact_detail_error,
+    detail_error, is_compact
+)
+from .settings import friendly_settings
+from .utils import is_friendly
+
+
+def get_exception_headers(exc):
+    headers = {}
+    if getattr(exc, 'auth_header', None):
+        headers['WWW-Authenticate'] = exc.auth_header
+    if getattr(exc, 'wait', None):
+        headers['Retry-After'] = '%d' % exc.wait
+    return headers
+
+
+def build_friendly_body(exc, error_code, compact=False):
+    """
+    Builds the friendly body straight from `exc.detail`, without building
+    the intermediate DRF response body first.
+    """
+    detail = exc.detail
+    if compact:
+        if isinstance(detail, dict):
+            errors = [compact_detail_error(field) for field in detail]
+        elif isinstance(detail, list):
+            errors = [compact_detail_error(None) for _ in detail]
+        else:
+            return build_detail_body(None, error_code, exc.status_code,
+                                     compact=True)
+        return {'code': error_code, 'status_code': exc.status_code,
+                'errors': errors}
+    if isinstance(detail, dict):
+        error_message = detail.get('detail', exc.__class__.__name__)
+        errors = [detail_error(field,
+                               value[0] if type(value) is list else value)
+                  for field, value in detail.items()]
+    elif isinstance(detail, list):
+        error_message = detail[0] if detail else exc.__class__.__name__
+        errors = [detail_error(None, message) for message in detail]
+    else:
+        return build_detail_body(detail, error_code, exc.status_code)
+    return {'code': error_code, 'message': error_message,
+            'status_code': exc.status_code, 'errors': errors}
 
 
 def friendly_exception_handler(exc, context):
-    response = exception_handler(exc, context)
-
-    if not response and settings.CATCH_ALL_EXCEPTIONS:
-        exc = APIException(exc)
-        response = exception_handler(exc, context)
-
-    if response is not None:
-        if is_pretty(response):
-            return response
-        error_message = response.data.get('detail', str(exc.__class__.__name__))
-        error_code = settings.FRIENDLY_EXCEPTION_DICT.get(exc.__class__.__name__)
-        data = response.data
-        errors = []
-        for field, value in data.items():
-            message = value[0] if type(value) is list else value
-            errors.append({"field": field, "message": message})
-
-        response.data = {'code': error_code, 'message': error_message,
-                         'status_code': response.status_code, 'errors': errors}
-
-    return response
+    with instrumentation.timed('exception_handler', exc.__class__.__name__):
+        return handle_exception(exc, context)
+
+
+def handle_exception(exc, context):
+    compact = is_compact(context.get('request'))
+
+    if isinstance(exc, exceptions.APIException):
+        error_code = get_exception_code(exc.__class__)
+    elif isinstance(exc, Http404):
+        error_code = get_exception_code(exc.__class__)
+        exc = exceptions.NotFound(
+            get_message(exceptions.NotFound.default_detail))
+    elif isinstance(exc, PermissionDenied):
+        error_code = get_exception_code(exc.__class__)
+        exc = exceptions.PermissionDenied(
+            get_message(exceptions.PermissionDenied.default_detail))
+    else:
+        if not friendly_settings.CATCH_ALL_EXCEPTIONS:
+            return None
+        # Wrapped exceptions only get a code of their own from an explicit
+        # class or dotted path entry, not from a coincidental class name.
+        error_code = get_exception_code(exc.__class__, match_name=False)
+        exc = exceptions.APIException(exc)
+        if error_code is None:
+            error_code = get_exception_code(exceptions.APIException)
+
+    set_rollback()
+    headers = get_exception_headers(exc)
+    if isinstance(exc.detail, str):
+        if instrumentation.sinks:
+            instrumentation.count('exception_handler.prebuilt',
+                                  exc.__class__.__name__)
+        return PrebuiltBodyResponse(exc, error_code, compact=compact,
+                                    status=exc.status_code, headers=headers)
+    if is_friendly(exc.detail):
+        path = 'friendly'
+        data = exc.detail
+        if compact and 'message' in data:
+            # Raised by a serializer which had no request to negotiate with
+            data = as_compact_errors(data)
+    else:
+        path = 'built'
+        data = build_friendly_body(exc, error_code, compact)
+    if instrumentation.sinks:
+        instrumentation.count('exception_handler.' + path,
+                              exc.__class__.__name__)
+    return Response(data, status=exc.status_code, headers=headers)
@@ -0,0 +1,130 @@
+"""
+Opt-in instrumentation of error formatting. Nothing is recorded until a
+sink is added with `add_sink`, a sink being any callable which accepts an
+`Event`:
+
+    registry = add_sink(MemoryRegistry())
+    ...
+    registry.snapshot()
+
+Events are either counters (`duration` is `None`), such as the path used
+to resolve an error code, or timings of a stage in seconds.
+"""
+import logging
+import time
+from collections import Counter, namedtuple
+from threading import Lock
+
+Event = namedtuple('Event', ['name', 'source', 'field', 'duration'])
+
+sinks = []
+
+
+class NullTimer(object):
+    """
+    No-op stand-in for `Timer` while no sink is registered.
+    """
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return None
+
+
+NULL_TIMER = NullTimer()
+
+
+def add_sink(sink):
+    if sink not in sinks:
+        sinks.append(sink)
+    return sink
+
+
+def remove_sink(sink):
+    if sink in sinks:
+        sinks.remove(sink)
+
+
+def emit(event):
+    for sink in list(sinks):
+        sink(event)
+
+
+def count(name, source=None, field=None):
+    emit(Event(name, source, field, None))
+
+
+class Timer(object):
+    __slots__ = ('name', 'source', 'start')
+
+    def __init__(self, name, source):
+        self.name = name
+        self.source = source
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        emit(Event(self.name, self.source, None,
+                   time.perf_counter() - self.start))
+
+
+def timed(name, source=None):
+    """
+    Times the wrapped block, or does nothing when no sink is registered.
+    """
+    if not sinks:
+        return NULL_TIMER
+    return Timer(name, source)
+
+
+class LoggingSink(object):
+
+    def __init__(self, logger=None, level=logging.DEBUG):
+        self.logger = logger or logging.getLogger(__name__)
+        self.level = level
+
+    def __call__(self, event):
+        if event.duration is None:
+            self.logger.log(self.level, '%s source=%s field=%s', event.name,
+                            event.source, event.field)
+        else:
+            self.logger.log(self.level, '%s source=%s took %.6fs',
+                            event.name, event.source, event.duration)
+
+
+class MemoryRegistry(object):
+    """
+    Aggregates events in memory: counters by `(name, source, field)` and
+    timings as `[count, total, max]` by `(name, source)`.
+    """
+
+    def __init__(self):
+        self.lock = Lock()
+        self.counters = Counter()
+        self.timings = {}
+
+    def __call__(self, event):
+        with self.lock:
+            if event.duration is None:
+                self.counters[(event.name, event.source, event.field)] += 1
+                return
+            timing = self.timings.setdefault((event.name, event.source),
+                                             [0, 0.0, 0.0])
+            timing[0] += 1
+            timing[1] += event.duration
+            timing[2] = max(timing[2], event.duration)
+
+    def snapshot(self):
+        with self.lock:
+            return {'counters': dict(self.counters),
+                    'timings': {key: tuple(value)
+                                for key, value in self.timings.items()}}
+
+    def reset(self):
+        with self.lock:
+            self.counters.clear()
+            self.timings.clear()
@@ -0,0 +1,60 @@
+from django.test.signals import setting_changed
+from django.utils import translation
+from django.utils.functional import Promise
+
+try:
+    from django.utils.autoreload import file_changed
+except ImportError:
+    # Django < 2.2
+    file_changed = None
+
+MAX_MESSAGES = 1024
+
+# Resolved messages by language, then by key: `(lazy message, string)`
+_messages = {}
+
+
+def get_message(message, key=None):
+    """
+    Returns `message` as a string in the active language. Lazy messages
+    are resolved once per language and `key`, which defaults to the
+    identity of the lazy object, instead of on every error response.
+    """
+    if not isinstance(message, Promise):
+        return message
+    if key is None:
+        key = id(message)
+    language = translation.get_language()
+    messages = _messages.get(language)
+    if messages is None:
+        messages = _messages.setdefault(language, {})
+    cached = messages.get(key)
+    # The lazy object is kept along, so a reused id or a message replaced
+    # under the same key is never served from a stale entry
+    if cached is not None and cached[0] is message:
+        return cached[1]
+    if len(messages) >= MAX_MESSAGES:
+        messages.clear()
+    resolved = str(message)
+    messages[key] = (message, resolved)
+    return resolved
+
+
+def clear_messages():
+    _messages.clear()
+
+
+def clear_messages_on_setting_change(*args, **kwargs):
+    if kwargs['setting'] in ('LANGUAGES', 'LANGUAGE_CODE', 'LOCALE_PATHS'):
+        clear_messages()
+
+
+def clear_messages_on_catalog_change(sender, file_path, **kwargs):
+    # Mirrors Django's own reset of its catalogs on `.mo` changes
+    if file_path.suffix == '.mo':
+        clear_messages()
+
+
+setting_changed.connect(clear_messages_on_setting_change)
+if file_changed is not None:
+    file_changed.connect(clear_messages_on_catalog_change)
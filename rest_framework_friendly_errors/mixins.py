@@ -1,17 +1,37 @@
 from __future__ import unicode_literals
 
-from django.conf import settings as dj_settings
+from collections import OrderedDict
+from collections.abc import Mapping
+from functools import partial
+
+from django.core.exceptions import FieldDoesNotExist
 from django.core.exceptions import ValidationError as DjangoValidationError
-from django.utils import timezone
-# from django.utils.encoding import force_text
-from django.utils.encoding import force_str
 from rest_framework.exceptions import ErrorDetail
 from rest_framework.exceptions import ValidationError as RestValidationError
+from rest_framework.fields import Field, empty, get_error_detail
+from rest_framework.relations import (
+    ManyRelatedField, PrimaryKeyRelatedField, SlugRelatedField
+)
+from rest_framework.serializers import ListSerializer
 from rest_framework.settings import api_settings
-from rest_framework.utils.serializer_helpers import ReturnDict
 
-from . import settings
-from .field_map import FieldMap
+from . import instrumentation
+from .codes import get_error_code_table, get_field_error_codes
+from .errors import error_entry
+from .field_map import FieldMap, find_message_candidates
+from .messages import get_message
+from .serializers import FriendlyListSerializer, ValidationAborted
+from .settings import INVALID_DATA_MESSAGE, friendly_settings
+from .utils import matches_template
+from .walker import (
+    build_pretty_errors, count_error_entries, get_pretty_errors,
+    iter_error_entries, validate
+)
+
+
+# Per-run validation state, kept per item by `FriendlyListSerializer`
+VALIDATION_STATE = ('registered_errors', 'registered_field_errors',
+                    'registered_non_field_errors', 'failed_validators')
 
 
 class FriendlyErrorMessagesMixin(FieldMap):
@@ -22,16 +42,201 @@ class FriendlyErrorMessagesMixin(FieldMap):
 
     FIELD_VALIDATION_ERRORS = {}
     NON_FIELD_ERRORS = {}
+    # Overrides `FAIL_FAST_ERRORS` setting for this serializer
+    FAIL_FAST_ERRORS = None
 
     def __init__(self, *args, **kwargs):
-        self.registered_errors = {}
+        self.reset_validation_state()
+        self.fail_fast_limit = None
         super(FriendlyErrorMessagesMixin, self).__init__(*args, **kwargs)
 
+    def reset_validation_state(self):
+        self.registered_errors = {}
+        # Registered entries by field name and by their non-field error key
+        self.registered_field_errors = {}
+        self.registered_non_field_errors = {}
+        self.failed_validators = {}
+
+    def clear_validation_state(self):
+        # Only used containers are replaced, empty ones may be kept as
+        # snapshots never share them, see `get_validation_state`
+        for name in VALIDATION_STATE:
+            if getattr(self, name):
+                setattr(self, name, {})
+
+    def get_validation_state(self):
+        """
+        Returns the state of the last run, along with the state of nested
+        friendly serializers, so the errors of a `many=True` item can still
+        be resolved after the following items were validated.
+        """
+        state = [getattr(self, name) or {} for name in VALIDATION_STATE]
+        state.append([(field, field.get_validation_state())
+                      for field in self.get_nested_friendly_fields()])
+        return state
+
+    def set_validation_state(self, state):
+        for name, value in zip(VALIDATION_STATE, state):
+            setattr(self, name, value)
+        for field, field_state in state[-1]:
+            field.set_validation_state(field_state)
+
+    def get_nested_friendly_fields(self):
+        nested = self.__dict__.get('_friendly_nested_fields')
+        if nested is None:
+            nested = self._friendly_nested_fields = [
+                field for field in self.fields.values()
+                if hasattr(field, 'get_validation_state')]
+        return nested
+
+    @classmethod
+    def get_fail_fast_errors(cls):
+        if cls.FAIL_FAST_ERRORS is not None:
+            return cls.FAIL_FAST_ERRORS
+        return friendly_settings.FAIL_FAST_ERRORS
+
+    def run_validation(self, data=empty):
+        self.clear_validation_state()
+        # The limit is read once per run, not for every field
+        self.fail_fast_limit = self.get_fail_fast_errors()
+        self.capture_validation_failures()
+        self.fail_fast_errors = OrderedDict()
+        self.fail_fast_count = 0
+        try:
+            return super(FriendlyErrorMessagesMixin, self).run_validation(
+                data)
+        except ValidationAborted as exc:
+            raise RestValidationError(exc.errors)
+
+    def capture_validation_failures(self):
+        """
+        Routes the validators and `validate_<field>` methods of every
+        writable field through recording wrappers, so the failing one is
+        known at the moment it raises instead of being looked up again
+        afterwards. Wrappers are installed once per bound serializer, not
+        on every run (which is every item of a `many=True` payload).
+        """
+        fail_fast = self.fail_fast_limit is not None
+        installed = self.__dict__.get('_friendly_wrappers')
+        if installed is not None and (installed or not fail_fast):
+            return
+        for field in self.fields.values():
+            if field.read_only:
+                continue
+            if installed is None:
+                if 'run_validators' not in field.__dict__ \
+                        and type(field).run_validators is \
+                        Field.run_validators:
+                    field.run_validators = partial(self.run_field_validators,
+                                                   field)
+                method_name = 'validate_' + field.field_name
+                method = getattr(self, method_name, None)
+                if method is not None and method_name not in self.__dict__:
+                    setattr(self, method_name, partial(
+                        self.run_field_validate_method, field, method))
+            if fail_fast and 'run_validation' not in field.__dict__:
+                field.run_validation = partial(self.run_field_validation,
+                                               field, field.run_validation)
+        # `True` once the fail-fast wrappers are installed as well
+        self._friendly_wrappers = fail_fast
+
+    def run_field_validation(self, field, run_validation, data):
+        try:
+            return run_validation(data)
+        except RestValidationError as exc:
+            self.collect_fail_fast_error(field.field_name, exc.detail)
+            raise
+        except DjangoValidationError as exc:
+            self.collect_fail_fast_error(field.field_name,
+                                         get_error_detail(exc))
+            raise
+
+    def collect_fail_fast_error(self, field_name, detail):
+        """
+        Keeps field errors of the current validation run and aborts it once
+        `FAIL_FAST_ERRORS` entries have been collected.
+        """
+        limit = self.fail_fast_limit
+        if limit is None:
+            return
+        self.fail_fast_errors[field_name] = detail
+        self.fail_fast_count += count_error_entries(detail)
+        if self.fail_fast_count >= limit:
+            raise ValidationAborted(self.fail_fast_errors)
+
+    def run_field_validators(self, field, value):
+        errors = []
+        for validator in field.validators:
+            try:
+                if getattr(validator, 'requires_context', False):
+                    validator(value, field)
+                else:
+                    if hasattr(validator, 'set_context'):
+                        validator.set_context(field)
+                    validator(value)
+            except RestValidationError as exc:
+                if isinstance(exc.detail, dict):
+                    raise
+                details = exc.detail
+            except DjangoValidationError as exc:
+                details = get_error_detail(exc)
+            else:
+                continue
+            self.record_failed_validator(field.field_name, validator, details)
+            errors.extend(details)
+        if errors:
+            raise RestValidationError(errors)
+
+    def run_field_validate_method(self, field, method, value):
+        try:
+            return method(value)
+        except RestValidationError as exc:
+            if not isinstance(exc.detail, dict):
+                self.record_failed_validator(field.field_name, method,
+                                             exc.detail)
+            self.collect_fail_fast_error(field.field_name, exc.detail)
+            raise
+        except DjangoValidationError as exc:
+            detail = get_error_detail(exc)
+            self.record_failed_validator(field.field_name, method, detail)
+            self.collect_fail_fast_error(field.field_name, detail)
+            raise
+
+    def record_failed_validator(self, field_name, validator, details):
+        failed = self.failed_validators.setdefault(field_name, {})
+        for detail in details:
+            failed[str(detail)] = validator
+
+    def get_failed_validator(self, field, error):
+        return self.failed_validators.get(field.field_name, {}).get(str(error))
+
+    def is_valid(self, raise_exception=False):
+        return validate(self, super(FriendlyErrorMessagesMixin, self),
+                        self.__class__.__name__, raise_exception)
+
     @property
     def errors(self):
-        ugly_errors = super(FriendlyErrorMessagesMixin, self).errors
-        pretty_errors = self.build_pretty_errors(ugly_errors)
-        return ReturnDict(pretty_errors, serializer=self)
+        """
+        Pretty errors are built on first access and reused until the
+        serializer is validated again.
+        """
+        return get_pretty_errors(self,
+                                 super(FriendlyErrorMessagesMixin, self))
+
+    @classmethod
+    def many_init(cls, *args, **kwargs):
+        list_serializer = super(FriendlyErrorMessagesMixin, cls).many_init(
+            *args, **kwargs)
+        if type(list_serializer) is ListSerializer:
+            # No custom `list_serializer_class` in Meta. The child is
+            # already bound to the list serializer, so it is promoted in
+            # place rather than built again.
+            list_serializer.__class__ = FriendlyListSerializer
+        return list_serializer
+
+    @classmethod
+    def get_error_code_table(cls):
+        return get_error_code_table(cls)
 
     def register_errors(self, errors):
         for error_details in errors:
@@ -46,9 +251,6 @@ class FriendlyErrorMessagesMixin(FieldMap):
             if error_code is None:
                 raise ValueError('For non field error you must provide '
                                  'an error code')
-            error = {'code': error_code,
-                     'message': error_message,
-                     'field': None}
             key = '%s_%s' % (error_message, error_code)
         else:
             key = field_name
@@ -60,227 +262,232 @@ class FriendlyErrorMessagesMixin(FieldMap):
                 raise ValueError('You have to provide either error key'
                                  ' or error code')
             if error_code is None:
-                try:
-                    error_code = settings.FRIENDLY_FIELD_ERRORS[field_type].get(
-                        error_key)
-                except KeyError:
+                field_errors = get_field_error_codes(field_instance.__class__)
+                if not field_errors:
                     raise ValueError('Unknown field type: "%s"' % field_type)
+                error_code = field_errors.get(error_key)
                 if error_code is None:
                     raise ValueError('Unknown error key: "%s" '
                                      'for field type: "%s"' %
                                      (error_key, field_type))
-            error = {'code': error_code,
-                     'field': field_name,
-                     'message': error_message}
 
-        if meta is not None:
-            error['meta'] = meta
+        error = error_entry(error_code, field_name, error_message, meta)
 
         if field_name is not None:
             self.registered_errors[field_name] = [error]
+            self.registered_field_errors[field_name] = error
         else:
             non_field_errors_key = api_settings.NON_FIELD_ERRORS_KEY
             if not self.registered_errors.get(non_field_errors_key):
                 self.registered_errors[non_field_errors_key] = []
             self.registered_errors[non_field_errors_key].append({key: [error]})
+            self.registered_non_field_errors[key] = error
 
         if raise_validation_error:
             raise RestValidationError(self.registered_errors)
 
-    def get_field_kwargs(self, field, field_data):
-        field_type = field.__class__.__name__
-        kwargs = {
-            'data_type': type(field_data).__name__,
-            'datatype': type(field_data).__name__
-        }
-        if field_type in self.field_map['boolean']:
-            kwargs.update({'input': field_data})
-        elif field_type in self.field_map['string']:
-            kwargs.update({'max_length': getattr(field, 'max_length', None),
-                           'min_length': getattr(field, 'min_length', None),
-                           'value': field_data})
-        elif field_type in self.field_map['numeric']:
-
-            kwargs.update({'min_value': field.min_value,
-                           'max_value': field.max_value,
-                           'decimal_places': getattr(field, 'decimal_places',
-                                                     None),
-                           'max_decimal_places': getattr(field,
-                                                         'decimal_places',
-                                                         None),
-                           'max_digits': getattr(field, 'max_digits', None)})
-            max_digits = kwargs['max_digits']
-            decimal_places = kwargs['decimal_places']
-            if max_digits is not None and decimal_places is not None:
-                whole_digits = max_digits - decimal_places
-                kwargs.update({'max_whole_digits': whole_digits})
-        elif field_type in self.field_map['date'].keys():
-            kwargs.update({'format': self.field_map['date'][field_type]})
-            field_timezone = getattr(field, 'timezone', self._timezone())
-            kwargs.update({'timezone': field_timezone})
-        elif field_type in self.field_map['choice']:
-            kwargs.update({'input': field_data,
-                           'input_type': type(field_data).__name__})
-        elif field_type in self.field_map['file']:
-            kwargs.update({'max_length': field.max_length,
-                           'length': len(field.parent.data.get(
-                               field.source, ''))})
-        elif field_type in self.field_map['composite']:
-            kwargs.update({'input_type': type(field_data).__name__,
-                           'max_length': getattr(field, 'max_length', None),
-                           'min_length': getattr(field, 'min_length', None)})
-        elif field_type in self.field_map['relation'] \
-            or field_type in self.field_map['serializer']:
-            kwargs.update({'pk_value': field_data,
-                           'input_type': type(field_data).__name__,
-                           'slug_name': getattr(field, 'slug_field', None),
-                           'value': field_data})
-        else:
-            kwargs.update({'max_length': getattr(field, 'max_length', None)})
-        return kwargs
-
     @staticmethod
-    def _timezone():
-        return timezone.get_current_timezone() if dj_settings.USE_TZ else None
+    def get_related_lookup(child):
+        """
+        Returns the lookup of a primary key or slug related field, and a
+        function which converts submitted values the way the model field
+        stores them.
+        """
+        model = child.get_queryset().model
+        if isinstance(child, SlugRelatedField):
+            return child.slug_field, \
+                model._meta.get_field(child.slug_field).to_python
+        to_python = model._meta.pk.to_python
+        if child.pk_field is None:
+            return 'pk', to_python
+        return 'pk', \
+            lambda value: to_python(child.pk_field.to_internal_value(value))
 
-    @staticmethod
-    def does_not_exist_many_to_many_handler(field, message, kwargs):
-        unformatted = field.error_messages['does_not_exist']
-        new_kwargs = kwargs
-        for value in kwargs['value']:
-            new_kwargs['value'] = value
-            if unformatted.format(**new_kwargs) == message:
-                return True
-        return False
+    def get_missing_related_values(self, field, error):
+        """
+        Returns all submitted values of a many-to-many `field` which do not
+        exist, looked up with a single query instead of one check per value.
+        Values are compared as the model field stores them and reported as
+        submitted. When the values cannot be queried, the submitted value
+        matching the one reported in `error` is returned. Returns None when
+        no submitted value can be told missing.
+        """
+        initial_data = getattr(self, 'initial_data', None)
+        if not isinstance(initial_data, Mapping):
+            return None
+        values = field.get_value(initial_data)
+        if not isinstance(values, (list, tuple)):
+            return None
+        child = field.child_relation
+        if isinstance(child, (PrimaryKeyRelatedField, SlugRelatedField)):
+            try:
+                lookup, to_python = self.get_related_lookup(child)
+                converted = [to_python(value) for value in values]
+                existing = set(child.get_queryset().filter(
+                    **{lookup + '__in': converted}).values_list(
+                        lookup, flat=True))
+            except (TypeError, ValueError, DjangoValidationError,
+                    RestValidationError, FieldDoesNotExist):
+                pass
+            else:
+                missing = OrderedDict()
+                for value, key in zip(values, converted):
+                    if key not in existing:
+                        missing.setdefault(key, value)
+                return list(missing.values()) or None
+
+        candidates = find_message_candidates(child, error)
+        params = dict(candidates).get('does_not_exist', {})
+        reported = params.get('pk_value', params.get('value'))
+        if reported is None:
+            return None
+        reported = str(reported)
+        for value in values:
+            if str(value) == reported:
+                return [value]
+        return None
 
     def find_key(self, field, message, field_name):
-        kwargs = self.get_field_kwargs(
-            field, self.initial_data.get(field_name)
-        )
-        for key in field.error_messages:
-            if key == 'does_not_exist' \
-                and isinstance(kwargs.get('value'), list) \
-                and self.does_not_exist_many_to_many_handler(
-                field, message, kwargs):
-                return key
-            unformatted = field.error_messages[key]
-            try:
-                if unformatted.format(**kwargs) == message:
+        code = getattr(message, 'code', None)
+        if code is not None:
+            return self.find_key_by_code(field, message, code)
+        return self.find_key_by_template(field, message, field_name)
+
+    @staticmethod
+    def find_key_by_code(field, message, code):
+        """
+        Resolves the error key from `ErrorDetail.code`. The code is only
+        trusted when the message is consistent with the template stored
+        under that key, so validators reusing generic codes such as
+        `invalid` are not mistaken for built-in field errors.
+        """
+        while field is not None:
+            template = field.error_messages.get(code)
+            if template is not None \
+                    and matches_template(get_message(template), message):
+                return code
+            field = getattr(field, 'child_relation', None)
+        return None
+
+    def find_key_by_template(self, field, message, field_name):
+        """
+        Lookup for plain string errors which carry no code, through the
+        compiled reverse index of the field's `error_messages`.
+        """
+        candidates = find_message_candidates(field, message)
+        if len(candidates) == 1:
+            return candidates[0][0]
+        if candidates:
+            # Several templates match, so pick the one whose placeholders
+            # agree with the field's own settings
+            kwargs = self.get_field_kwargs(
+                field, self.get_initial_value(field_name)
+            )
+            for key, params in candidates:
+                if all(str(kwargs[name]) == value
+                       for name, value in params.items() if name in kwargs):
                     return key
-            except KeyError:
-                pass
+            return candidates[0][0]
         if getattr(field, 'child_relation', None):
-            return self.find_key(field=field.child_relation, message=message,
-                                 field_name=field_name)
+            return self.find_key_by_template(field=field.child_relation,
+                                             message=message,
+                                             field_name=field_name)
         return None
 
-    def _run_validator(self, validator, field, message, parent=None):
+    @staticmethod
+    def get_validator_name(validator):
         try:
-            if parent:
-                initial_data = self.initial_data[parent.field_name]
-                for data in initial_data:
-                    validator(data[field.field_name])
-            else:
-                validator(self.initial_data[field.field_name])
-        except (DjangoValidationError, RestValidationError) as err:
-            err_message = err.detail[0] \
-                if hasattr(err, 'detail') else err.message
-            return err_message == message
-
-    def find_validator(self, field, message):
-        for validator in field.validators:
-            if self._run_validator(validator, field, message):
-                return validator
+            return validator.__name__
+        except AttributeError:
+            return validator.__class__.__name__
 
     def get_validator_error_code(self, validator, error):
-        try:
-            name = validator.__name__
-        except AttributeError:
-            name = validator.__class__.__name__
-        return self.FIELD_VALIDATION_ERRORS.get(name) \
-               or settings.FRIENDLY_VALIDATOR_ERRORS.get(name) \
-               or getattr(error, 'code', None)
+        name = self.get_validator_name(validator)
+        return self.get_error_code_table().validator_code(name) \
+            or getattr(error, 'code', None)
+
+    def get_initial_value(self, field_name):
+        initial_data = getattr(self, 'initial_data', None)
+        if isinstance(initial_data, Mapping):
+            return initial_data.get(field_name)
+        return None
 
     def is_default_error(self, error):
-        return settings.INVALID_DATA_MESSAGE.format(
-            data_type=type(self.initial_data).__name__) == error
+        initial_data = getattr(self, 'initial_data', None)
+        return INVALID_DATA_MESSAGE.format(
+            data_type=type(initial_data).__name__) == error
 
-    def get_field_error_entry(self, error, field):
-        if field.field_name in self.registered_errors:
-            err = self.registered_errors[field.field_name][0]
-            if err['message'] == error['message']:
-                return err
+    def record_resolution(self, path, field_name=None):
+        if instrumentation.sinks:
+            instrumentation.count('resolution.' + path,
+                                  self.__class__.__name__, field_name)
+
+    def get_registered_error_entry(self, error, field_name, registered=None):
+        """
+        Returns the entry of an error raised through `register_error`,
+        resolved from the code it carries. DRF turns raised values into
+        strings, so the original code and meta are taken from `registered`,
+        the entry registered in the same run, when it is the same error.
+        """
+        code = error.get('code')
+        if registered is not None \
+                and str(registered['code']) == str(code) \
+                and registered['message'] == error.get('message'):
+            return dict(registered)
+        if isinstance(code, str):
+            code = int(code) if code.isdigit() else str(code)
+        return error_entry(code, field_name, error.get('message'),
+                           error.get('meta'))
 
+    def get_field_error_entry(self, error, field):
         if isinstance(error, dict):
+            if 'code' in error:
+                self.record_resolution('registered', field.field_name)
+                return self.get_registered_error_entry(
+                    error, field.field_name,
+                    self.registered_field_errors.get(field.field_name))
             _, errors = list(error.items())[0]
-            error = force_text(errors[0])
+            error = errors[0]
 
         if self.is_default_error(error):
-            return {'code': settings.FRIENDLY_NON_FIELD_ERRORS['invalid'],
-                    'field': field.field_name,
-                    'message': error}
-        field_type = field.__class__.__name__
+            self.record_resolution('default', field.field_name)
+            return error_entry(
+                friendly_settings.FRIENDLY_NON_FIELD_ERRORS['invalid'],
+                field.field_name, error)
         key = self.find_key(field, error, field.field_name)
-        if not key:
+        if key:
+            self.record_resolution(
+                'template' if getattr(error, 'code', None) is None
+                else 'code', field.field_name)
+        else:
             # Here we know that error was raised by a custom field validator
-            validator = self.find_validator(field, error)
+            # or by custom validate method in serializer
+            validator = self.get_failed_validator(field, error)
             if validator:
-                try:
-                    name = validator.__name__
-                    code = self.FIELD_VALIDATION_ERRORS.get(name) or settings.FRIENDLY_VALIDATOR_ERRORS.get(name)
-                    return {'code': code,
-                            'field': field.field_name,
-                            'message': error}
-                except AttributeError:
-                    name = validator.__class__.__name__
-                    code = self.FIELD_VALIDATION_ERRORS.get(name) or settings.FRIENDLY_VALIDATOR_ERRORS.get(name)
-                    return {'code': code,
-                            'field': field.field_name,
-                            'message': error}
-                # Here we know that error was raised by a custom field validator
-                # but field might be using another serializer
-                # with `many=True` option
-                if getattr(field, 'child', None) \
-                    and getattr(field, 'parent', None) == self \
-                    and field.__class__.__name__ == 'ListSerializer':
-                    for _, child_field in field.child.fields.items():
-                        validator = self.find_validator(
-                            child_field, error, parent=field)
-                        if validator:
-                            code = self.get_validator_error_code(validator, error)
-                            return {'code': code,
-                                    'field': field.field_name,
-                                    'message': error}
-            # Here we know that error was raised by custom validate method
-            # in serializer
-            validator = getattr(self, "validate_%s" % field.field_name, None)
-            if validator and self._run_validator(validator, field, error):
                 code = self.get_validator_error_code(validator, error)
-                return {'code': code,
-                        'field': field.field_name,
-                        'message': error}
+                name = self.get_validator_name(validator)
+                self.record_resolution(
+                    'validate_method' if name == 'validate_' + field.field_name
+                    else 'validator', field.field_name)
+                return error_entry(code, field.field_name, error)
             # maybe field error was raised directly from `validate` method
-            elif self.FIELD_VALIDATION_ERRORS.get(field.field_name, None):
-                code = self.FIELD_VALIDATION_ERRORS.get(
-                    field.field_name, getattr(error, 'code', None))
-                return {'code': code,
-                        'field': field.field_name,
-                        'message': error}
-            elif settings.FRIENDLY_FIELD_ERRORS.get(field_type, None):
-                code = settings.FRIENDLY_FIELD_ERRORS.get(field_type, {}).get(getattr(error, 'code', None), None)
-                return {'code': code,
-                        'field': field.field_name,
-                        'message': error}
-            else:
-                code = getattr(error, 'code', None)
-                return {'code': code,
-                        'field': field.field_name,
-                        'message': error}
+            code = self.get_error_code_table().field_name_code(
+                field.field_name)
+            if code is not None:
+                self.record_resolution('field_name', field.field_name)
+                return error_entry(code, field.field_name, error)
+            self.record_resolution('fallback', field.field_name)
+            key = getattr(error, 'code', None)
 
-        code = settings.FRIENDLY_FIELD_ERRORS.get(field_type, {}).get(key, getattr(error, 'code', None))
-        return {'code': code,
-                'field': field.field_name,
-                'message': error}
+        code = self.get_error_code_table().field_code(field, key)
+        if code is None:
+            code = getattr(error, 'code', None)
+        if key == 'does_not_exist' and isinstance(field, ManyRelatedField):
+            missing = self.get_missing_related_values(field, error)
+            if missing:
+                return error_entry(code, field.field_name, error,
+                                   meta={'missing': missing})
+        return error_entry(code, field.field_name, error)
 
     def get_field_error_entries(self, errors, field):
         if isinstance(errors, dict):
@@ -301,39 +508,34 @@ class FriendlyErrorMessagesMixin(FieldMap):
         elif isinstance(error, ErrorDetail):
             error = str(error)
 
-        registered_errors = self.registered_errors.get(
-            api_settings.NON_FIELD_ERRORS_KEY, {})
-        for registered_error in registered_errors:
-            if error in registered_error:
-                return registered_error[error][0]
+        if isinstance(original_error, dict):
+            registered = original_error[error]
+            if isinstance(registered, list) and registered \
+                    and isinstance(registered[0], Mapping) \
+                    and 'code' in registered[0]:
+                self.record_resolution('registered')
+                return self.get_registered_error_entry(
+                    registered[0], None,
+                    self.registered_non_field_errors.get(error))
 
         if self.is_default_error(error):
-            return {'code': settings.FRIENDLY_NON_FIELD_ERRORS.get('invalid'),
-                    'field': None,
-                    'message': error}
-        code = self.NON_FIELD_ERRORS.get(
-            error, settings.FRIENDLY_NON_FIELD_ERRORS.get(
-                error, getattr(original_error, 'code', None)))
-        return {'code': code,
-                'field': None,
-                'message': error}
+            self.record_resolution('default')
+            return error_entry(
+                friendly_settings.FRIENDLY_NON_FIELD_ERRORS.get('invalid'),
+                None, error)
+        self.record_resolution('non_field')
+        code = self.get_error_code_table().non_field_code(
+            error, code=getattr(original_error, 'code', None))
+        return error_entry(code, None, error)
 
     def get_non_field_error_entries(self, errors):
         return [self.get_non_field_error_entry(error) for error in errors]
 
+    def iter_pretty_errors(self, errors, compact=False):
+        """
+        Lazily yields friendly entries for `errors`.
+        """
+        return iter_error_entries(self, errors, compact=compact)
+
     def build_pretty_errors(self, errors):
-        pretty = []
-        for error_type in errors:
-            if error_type == 'non_field_errors':
-                pretty.extend(self.get_non_field_error_entries(
-                    errors[error_type]))
-            else:
-                field = self.fields[error_type]
-                pretty.extend(
-                    self.get_field_error_entries(errors[error_type], field),
-                )
-        if pretty:
-            return {'code': settings.VALIDATION_FAILED_CODE,
-                    'message': settings.VALIDATION_FAILED_MESSAGE,
-                    'errors': pretty}
-        return {}
+        return build_pretty_errors(self, errors, self.__class__.__name__)
@@ -0,0 +1,142 @@
+import json
+from collections import namedtuple
+from functools import lru_cache
+from json.encoder import encode_basestring, encode_basestring_ascii
+from operator import itemgetter
+
+from django.utils import translation
+from rest_framework.compat import LONG_SEPARATORS, SHORT_SEPARATORS
+from rest_framework.renderers import JSONRenderer
+
+from .errors import COMPACT_KEYS, DEFAULT_KEYS
+from .utils import is_friendly
+
+get_code = itemgetter('code')
+get_field = itemgetter('field')
+get_message = itemgetter('message')
+
+EncodingOptions = namedtuple('EncodingOptions', [
+    'encoder_class', 'ensure_ascii', 'strict', 'separators', 'language'])
+
+
+def dumps(options, value):
+    """
+    Encodes `value` the way `JSONRenderer` does without indent, except
+    for the final `\\u2028`/`\\u2029` escaping which is done once per body.
+    """
+    return json.dumps(value, cls=options.encoder_class,
+                      ensure_ascii=options.ensure_ascii,
+                      allow_nan=not options.strict,
+                      separators=options.separators)
+
+
+@lru_cache(maxsize=4096)
+def _encode_value(options, value_type, value):
+    return dumps(options, value)
+
+
+def encode_value(options, value):
+    """
+    Encodes a value which repeats across responses, such as an error code
+    or a translated message, once per language.
+    """
+    try:
+        return _encode_value(options, type(value), value)
+    except TypeError:
+        return dumps(options, value)
+
+
+@lru_cache(maxsize=32)
+def get_entry_affixes(options):
+    """
+    Returns the constant text around the values of an error entry.
+    """
+    item_separator, key_separator = options.separators
+    return ('{"code"' + key_separator,
+            item_separator + '"field"' + key_separator,
+            item_separator + '"message"' + key_separator,
+            '}')
+
+
+class FriendlyJSONRenderer(JSONRenderer):
+    """
+    `JSONRenderer` which writes friendly error bodies straight to bytes.
+    Each distinct code and message is encoded once per body, and cached
+    across bodies, so only field paths are encoded for every entry. Any
+    other data, entries with other keys such as `meta`, and indented
+    output, is rendered by `JSONRenderer`.
+    """
+
+    def get_encoding_options(self):
+        return EncodingOptions(
+            self.encoder_class, self.ensure_ascii, self.strict,
+            SHORT_SEPARATORS if self.compact else LONG_SEPARATORS,
+            translation.get_language())
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        entries = None
+        if is_friendly(data) and self.get_indent(
+                accepted_media_type, renderer_context or {}) is None:
+            options = self.get_encoding_options()
+            entries = self.render_entries(options, data['errors'])
+        if entries is None:
+            return super(FriendlyJSONRenderer, self).render(
+                data, accepted_media_type, renderer_context)
+
+        item_separator, key_separator = options.separators
+        members = []
+        for key, value in data.items():
+            if key == 'errors':
+                members.append('"errors"%s[%s]' % (key_separator, entries))
+            else:
+                members.append(''.join((encode_value(options, key),
+                                        key_separator,
+                                        encode_value(options, value))))
+        ret = '{%s}' % item_separator.join(members)
+        return ret.replace('\u2028', '\\u2028').replace('\u2029', '\\u2029') \
+            .encode()
+
+    def render_entries(self, options, entries):
+        """
+        Returns the encoded `entries`, or None unless all of them are dicts
+        with the default or the compact keys, in that order. The work per
+        entry is left to `map` and `join`, which beats a Python loop and
+        the generic encoder alike.
+        """
+        if not entries or set(map(type, entries)) != {dict}:
+            return None
+        keys = set(map(tuple, entries))
+        compact = keys == {COMPACT_KEYS}
+        if not compact and keys != {DEFAULT_KEYS}:
+            return None
+        codes = list(map(get_code, entries))
+        encode_string = encode_basestring_ascii if options.ensure_ascii \
+            else encode_basestring
+        code_prefix, field_prefix, message_prefix, suffix = \
+            get_entry_affixes(options)
+        item_separator = options.separators[0]
+
+        # Entries share code and message objects, which the body keeps
+        # alive, so fragments are keyed by identity
+        code_ids = list(map(id, codes))
+        heads = {key: ''.join((code_prefix, encode_value(options, code),
+                               field_prefix))
+                 for key, code in dict(zip(code_ids, codes)).items()}
+        if compact:
+            tails = [suffix + item_separator] * len(entries)
+        else:
+            messages = list(map(get_message, entries))
+            message_ids = list(map(id, messages))
+            tails = {key: ''.join((message_prefix,
+                                   encode_value(options, message),
+                                   suffix, item_separator))
+                     for key, message in dict(zip(message_ids,
+                                                  messages)).items()}
+            tails = list(map(tails.__getitem__, message_ids))
+        parts = [None] * (3 * len(entries))
+        parts[::3] = map(heads.__getitem__, code_ids)
+        parts[1::3] = [encode_string(field) if field.__class__ is str
+                       else encode_value(options, field)
+                       for field in map(get_field, entries)]
+        parts[2::3] = tails
+        return ''.join(parts)[:-len(item_separator)]
@@ -0,0 +1,138 @@
+from functools import lru_cache
+
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+from rest_framework.utils.mediatypes import _MediaType
+
+from .renderers import FriendlyJSONRenderer
+from .settings import friendly_settings
+
+WAIT_PLACEHOLDER = '{wait}'
+
+# Renderers whose output only depends on the data and the media type
+PREBUILT_RENDERERS = (JSONRenderer, FriendlyJSONRenderer)
+
+
+def is_compact(request=None):
+    """
+    Tells whether errors for `request` are sent in compact form, with codes,
+    field paths and meta only. Clients choose with an `errors=compact` or
+    `errors=full` parameter of the accepted media type, e.g.
+    `Accept: application/json; errors=compact`, otherwise the
+    `COMPACT_ERRORS` setting applies.
+    """
+    media_type = getattr(request, 'accepted_media_type', None)
+    if media_type:
+        mode = _MediaType(media_type).params.get('errors')
+        if isinstance(mode, bytes):
+            # DRF < 3.14 keeps parameter values as bytes
+            mode = mode.decode('ascii', 'replace')
+        if mode == 'compact':
+            return True
+        if mode == 'full':
+            return False
+    return friendly_settings.COMPACT_ERRORS
+
+
+def get_detail_template(exc):
+    """
+    Returns `exc.detail` with the throttle wait replaced by a placeholder,
+    so all `Throttled` responses share one prebuilt body.
+    """
+    detail = str(exc.detail)
+    wait = getattr(exc, 'wait', None)
+    if wait is None:
+        return detail
+    head, sep, tail = detail.rpartition(str(wait))
+    if not sep:
+        return detail
+    return head + WAIT_PLACEHOLDER + tail
+
+
+def detail_error(field, message):
+    return {'field': field, 'message': message}
+
+
+def compact_detail_error(field):
+    return {'field': field}
+
+
+def build_detail_body(detail, error_code, status_code, compact=False):
+    if compact:
+        return {'code': error_code, 'status_code': status_code,
+                'errors': [compact_detail_error('detail')]}
+    return {'code': error_code, 'message': detail,
+            'status_code': status_code,
+            'errors': [detail_error('detail', detail)]}
+
+
+@lru_cache(maxsize=512)
+def get_encoded_body(renderer_class, media_type, indent, detail, error_code,
+                     status_code, compact):
+    """
+    Renders the friendly body of a simple exception once per detail, which
+    is already translated, code and status. The rendered bytes are split
+    around the wait placeholder so it can be patched in without rendering
+    again.
+    """
+    data = build_detail_body(detail, error_code, status_code, compact)
+    content = renderer_class().render(data, media_type, {'indent': indent})
+    if isinstance(content, str):
+        content = content.encode(renderer_class.charset)
+    return tuple(content.split(WAIT_PLACEHOLDER.encode()))
+
+
+class PrebuiltBodyResponse(Response):
+    """
+    Response of an exception with a plain string detail. `JSONRenderer`
+    and `FriendlyJSONRenderer` get the prebuilt body from
+    `get_encoded_body`, so `data` is only built when it is read. Once it
+    has been, e.g. to be changed, the body is rendered from `data` as
+    usual, as it is for any other renderer. Compact bodies carry no detail,
+    so they are shared by all languages.
+    """
+
+    def __init__(self, exc, error_code, compact=False, **kwargs):
+        super(PrebuiltBodyResponse, self).__init__(None, **kwargs)
+        self.detail = exc.detail
+        self.error_code = error_code
+        self.compact = compact
+        self.wait = getattr(exc, 'wait', None)
+        self.body_key = (None if compact else get_detail_template(exc),
+                         error_code, exc.status_code, compact)
+
+    @property
+    def data(self):
+        data = self.__dict__.get('_data')
+        if data is None:
+            data = self._data = build_detail_body(
+                self.detail, self.error_code, self.status_code, self.compact)
+        return data
+
+    @data.setter
+    def data(self, value):
+        self._data = value
+
+    @property
+    def rendered_content(self):
+        renderer = getattr(self, 'accepted_renderer', None)
+        media_type = getattr(self, 'accepted_media_type', None)
+        context = getattr(self, 'renderer_context', None)
+        # Subclasses may render differently or need the full context
+        if type(renderer) not in PREBUILT_RENDERERS or not media_type \
+                or context is None or self.__dict__.get('_data') is not None:
+            return super(PrebuiltBodyResponse, self).rendered_content
+        context['response'] = self
+
+        content_type = self.content_type
+        if content_type is None and renderer.charset is not None:
+            content_type = '{}; charset={}'.format(renderer.media_type,
+                                                   renderer.charset)
+        elif content_type is None:
+            content_type = renderer.media_type
+        self['Content-Type'] = content_type
+
+        chunks = get_encoded_body(renderer.__class__, media_type,
+                                  context.get('indent'), *self.body_key)
+        wait = WAIT_PLACEHOLDER if self.wait is None else str(self.wait)
+        return wait.encode().join(chunks)
@@ -0,0 +1,116 @@
+from __future__ import unicode_literals
+
+from functools import partial
+
+from rest_framework.exceptions import ValidationError
+from rest_framework.fields import empty
+from rest_framework.serializers import ListSerializer
+
+from .walker import (
+    build_pretty_errors, count_error_entries, get_pretty_errors,
+    iter_error_entries, validate
+)
+
+# DRF >= 3.15 validates every item of a list through `run_child_validation`
+HAS_RUN_CHILD_VALIDATION = hasattr(ListSerializer, 'run_child_validation')
+
+
+class ValidationAborted(Exception):
+    """
+    Raised to stop validation once enough errors have been collected in
+    fail-fast mode. Carries the errors collected so far.
+    """
+
+    def __init__(self, errors):
+        super(ValidationAborted, self).__init__(errors)
+        self.errors = errors
+
+
+class FriendlyListSerializer(ListSerializer):
+    """
+        A list serializer which formats errors of `many=True` payloads
+        according to friendly format, with the item index in the field path.
+        Used by default for `many=True` serializers with the
+        `FriendlyErrorMessagesMixin`.
+    """
+
+    def is_valid(self, raise_exception=False):
+        return validate(self, super(FriendlyListSerializer, self),
+                        self.child.__class__.__name__, raise_exception)
+
+    def get_fail_fast_errors(self):
+        get_fail_fast_errors = getattr(self.child, 'get_fail_fast_errors',
+                                       None)
+        return get_fail_fast_errors() if get_fail_fast_errors else None
+
+    def run_validation(self, data=empty):
+        if not HAS_RUN_CHILD_VALIDATION \
+                and 'run_validation' not in self.child.__dict__:
+            self.child.run_validation = partial(self._validate_item,
+                                                self.child.run_validation)
+        self.fail_fast_limit = self.get_fail_fast_errors()
+        self.item_states = []
+        self.item_errors = []
+        self.fail_fast_count = 0
+        try:
+            return super(FriendlyListSerializer, self).run_validation(data)
+        except ValidationAborted as exc:
+            raise ValidationError(exc.errors)
+
+    def run_child_validation(self, data):
+        return self._validate_item(
+            super(FriendlyListSerializer, self).run_child_validation, data)
+
+    def _validate_item(self, run_validation, data):
+        """
+        Validates a single item. The child's validation state is kept per
+        item, as the child is validated again for the next one before the
+        errors are formatted. In fail-fast mode the whole payload is
+        aborted once `FAIL_FAST_ERRORS` entries have been collected.
+        """
+        get_validation_state = getattr(self.child, 'get_validation_state',
+                                       None)
+        try:
+            validated = run_validation(data)
+        except ValidationError as exc:
+            self.item_states.append(
+                get_validation_state() if get_validation_state else None)
+            if self.fail_fast_limit is not None:
+                self.item_errors.append(exc.detail)
+                self.fail_fast_count += count_error_entries(exc.detail)
+                if self.fail_fast_count >= self.fail_fast_limit:
+                    raise ValidationAborted(self.item_errors)
+            raise
+        self.item_states.append(None)
+        self.item_errors.append({})
+        return validated
+
+    def get_validation_state(self):
+        return getattr(self, 'item_states', None)
+
+    def set_validation_state(self, state):
+        self.item_states = state
+
+    def restore_item_state(self, index):
+        """
+        Makes the child resolve errors with the state item `index` was
+        validated with.
+        """
+        item_states = getattr(self, 'item_states', None)
+        if item_states and index < len(item_states) \
+                and item_states[index] is not None:
+            self.child.set_validation_state(item_states[index])
+
+    @property
+    def errors(self):
+        return get_pretty_errors(self, super(FriendlyListSerializer, self))
+
+    def iter_pretty_errors(self, errors, compact=False):
+        """
+        Lazily yields friendly entries for `errors`.
+        """
+        return iter_error_entries(self, errors, owner=self.child,
+                                  compact=compact)
+
+    def build_pretty_errors(self, errors):
+        return build_pretty_errors(self, errors, self.child.__class__.__name__)
@@ -1,26 +1,19 @@
 from __future__ import unicode_literals
 
-from django.conf import settings
+import sys
+from copy import deepcopy
+from types import ModuleType
+
+from django.conf import settings as dj_settings
+from django.test.signals import setting_changed
 # from django.utils.translation import ugettext_lazy as _
 from django.utils.translation import gettext_lazy as _
 
 from .utils import update_field_settings
 
-USER_SETTINGS = getattr(settings, 'FRIENDLY_ERRORS', {})
-
-USER_FRIENDLY_FIELD_ERRORS = USER_SETTINGS.get('FIELD_ERRORS', {})
-USER_NON_FIELD_ERRORS = USER_SETTINGS.get('NON_FIELD_ERRORS', {})
-USER_VALIDATOR_ERRORS = USER_SETTINGS.get('VALIDATOR_ERRORS', {})
-USER_EXCEPTION_DICT = USER_SETTINGS.get('EXCEPTION_DICT', {})
-
-VALIDATION_FAILED_CODE = USER_SETTINGS.get('VALIDATION_FAILED_CODE', 1000)
-VALIDATION_FAILED_MESSAGE = USER_SETTINGS.get('VALIDATION_FAILED_MESSAGE',
-                                              _('Validation Failed'))
-
-CATCH_ALL_EXCEPTIONS = USER_SETTINGS.get(
-    'CATCH_ALL_EXCEPTIONS', False)
+INVALID_DATA_MESSAGE = 'Invalid data. Expected a dictionary, but got {data_type}.'
 
-FRIENDLY_FIELD_ERRORS = {
+DEFAULT_FIELD_ERRORS = {
     'BooleanField': {'required': 2001, 'invalid': 2011, 'null': 2021},
     'NullBooleanField': {'required': 2001, 'invalid': 2011, 'null': 2021},
 
@@ -71,10 +64,6 @@ FRIENDLY_FIELD_ERRORS = {
     'StringRequiredField': {'required': 2007, 'null': 2027},
     'PrimaryKeyRelatedField': {'required': 2007, 'null': 2027,
                                'does_not_exist': 2151, 'incorrect_type': 2161},
-    'CitixenPrimaryKeyRelatedField': {'required': 2007, 'null': 2027,
-                                      'does_not_exist': 2151, 'incorrect_type': 2161},
-    'CitixenGroupPermissionRelatedField': {'required': 2007, 'null': 2027,
-                                           'does_not_exist': 2151, 'incorrect_type': 2161},
     'HyperlinkedRelatedField': {'required': 2007, 'null': 2027,
                                 'does_not_exist': 2151, 'incorrect_type': 2161,
                                 'incorrect_match': 2171, 'no_match': 2171},
@@ -98,18 +87,11 @@ FRIENDLY_FIELD_ERRORS = {
     'DurationField': {'invalid': 2015},
 }
 
-FRIENDLY_FIELD_ERRORS = update_field_settings(FRIENDLY_FIELD_ERRORS,
-                                              USER_FRIENDLY_FIELD_ERRORS)
-
-INVALID_DATA_MESSAGE = 'Invalid data. Expected a dictionary, but got {data_type}.'
-
-FRIENDLY_NON_FIELD_ERRORS = {
+DEFAULT_NON_FIELD_ERRORS = {
     'invalid': 1001
 }
 
-FRIENDLY_NON_FIELD_ERRORS.update(USER_NON_FIELD_ERRORS)
-
-FRIENDLY_VALIDATOR_ERRORS = {
+DEFAULT_VALIDATOR_ERRORS = {
     'UniqueValidator': 3001,
     'UniqueTogetherValidator': 3003,
     'UniqueForDateValidator': 3004,
@@ -132,20 +114,126 @@ FRIENDLY_VALIDATOR_ERRORS = {
     'int_list_validator': 3020,
 }
 
-FRIENDLY_VALIDATOR_ERRORS.update(USER_VALIDATOR_ERRORS)
-
-FRIENDLY_EXCEPTION_DICT = {
-    'APIException': 4000,
-    'ParseError': 4001,
-    'AuthenticationFailed': 4002,
-    'NotAuthenticated': 4003,
-    'NotFound': 4004,
-    'Http404': 4004,
-    'PermissionDenied': 4005,
-    'MethodNotAllowed': 4006,
-    'NotAcceptable': 4007,
-    'UnsupportedMediaType': 4008,
-    'Throttled': 4009,
-    'ValidationError': 4010
+DEFAULT_EXCEPTION_DICT = {
+    'rest_framework.exceptions.APIException': 4000,
+    'rest_framework.exceptions.ParseError': 4001,
+    'rest_framework.exceptions.AuthenticationFailed': 4002,
+    'rest_framework.exceptions.NotAuthenticated': 4003,
+    'rest_framework.exceptions.NotFound': 4004,
+    'django.http.response.Http404': 4004,
+    'rest_framework.exceptions.PermissionDenied': 4005,
+    'django.core.exceptions.PermissionDenied': 4005,
+    'rest_framework.exceptions.MethodNotAllowed': 4006,
+    'rest_framework.exceptions.NotAcceptable': 4007,
+    'rest_framework.exceptions.UnsupportedMediaType': 4008,
+    'rest_framework.exceptions.Throttled': 4009,
+    'rest_framework.exceptions.ValidationError': 4010
 }
-FRIENDLY_EXCEPTION_DICT.update(USER_EXCEPTION_DICT)
+
+
+def build_settings(user_settings):
+    """
+    Merges `FRIENDLY_ERRORS` from the Django settings into the default
+    tables. Defaults are copied, so the merge can be repeated.
+    """
+    friendly_settings = {
+        'USER_SETTINGS': user_settings,
+        'USER_FRIENDLY_FIELD_ERRORS': user_settings.get('FIELD_ERRORS', {}),
+        'USER_NON_FIELD_ERRORS': user_settings.get('NON_FIELD_ERRORS', {}),
+        'USER_VALIDATOR_ERRORS': user_settings.get('VALIDATOR_ERRORS', {}),
+        'USER_EXCEPTION_DICT': user_settings.get('EXCEPTION_DICT', {}),
+
+        'VALIDATION_FAILED_CODE': user_settings.get('VALIDATION_FAILED_CODE',
+                                                    1000),
+        'VALIDATION_FAILED_MESSAGE': user_settings.get(
+            'VALIDATION_FAILED_MESSAGE', _('Validation Failed')),
+
+        'CATCH_ALL_EXCEPTIONS': user_settings.get('CATCH_ALL_EXCEPTIONS',
+                                                  False),
+
+        # Maximum number of entries in a validation error response, `None`
+        # for all
+        'MAX_ERRORS': user_settings.get('MAX_ERRORS', None),
+
+        # Number of errors after which validation is aborted, `None` to
+        # validate the whole payload
+        'FAIL_FAST_ERRORS': user_settings.get('FAIL_FAST_ERRORS', None),
+
+        # Emit codes, field paths and meta only, without messages. Clients
+        # can also ask for it with an `errors=compact` Accept parameter
+        'COMPACT_ERRORS': user_settings.get('COMPACT_ERRORS', False),
+    }
+
+    friendly_settings['FRIENDLY_FIELD_ERRORS'] = update_field_settings(
+        deepcopy(DEFAULT_FIELD_ERRORS),
+        friendly_settings['USER_FRIENDLY_FIELD_ERRORS'])
+    friendly_settings['FRIENDLY_NON_FIELD_ERRORS'] = dict(
+        DEFAULT_NON_FIELD_ERRORS,
+        **friendly_settings['USER_NON_FIELD_ERRORS'])
+    friendly_settings['FRIENDLY_VALIDATOR_ERRORS'] = dict(
+        DEFAULT_VALIDATOR_ERRORS,
+        **friendly_settings['USER_VALIDATOR_ERRORS'])
+    friendly_settings['FRIENDLY_EXCEPTION_DICT'] = dict(
+        DEFAULT_EXCEPTION_DICT)
+    friendly_settings['FRIENDLY_EXCEPTION_DICT'].update(
+        friendly_settings['USER_EXCEPTION_DICT'])
+    return friendly_settings
+
+
+class FriendlyErrorsSettings(object):
+    """
+    Lazy settings object, similar to DRF `api_settings`. Django settings are
+    read and the tables merged on first access, and the whole set is
+    rebuilt when `FRIENDLY_ERRORS` changes. Loaded values are stored as
+    instance attributes, so reads after the first one are plain attribute
+    lookups.
+    """
+
+    def __init__(self):
+        self._loaded = False
+
+    @property
+    def settings(self):
+        return build_settings(getattr(dj_settings, 'FRIENDLY_ERRORS', {}))
+
+    def __getattr__(self, attr):
+        # Only called for attributes which are not loaded yet
+        if attr.startswith('_') or self._loaded:
+            raise AttributeError("Invalid friendly errors setting: '%s'"
+                                 % attr)
+        self.__dict__.update(self.settings)
+        self._loaded = True
+        return getattr(self, attr)
+
+    def reload(self):
+        self._loaded = False
+        for attr in list(self.__dict__):
+            if not attr.startswith('_'):
+                self.__dict__.pop(attr, None)
+
+
+friendly_settings = FriendlyErrorsSettings()
+
+
+class SettingsModule(ModuleType):
+    """
+    Compatibility shim for module level access, e.g. `settings.MAX_ERRORS`
+    or `from rest_framework_friendly_errors.settings import
+    FRIENDLY_FIELD_ERRORS`. The package itself reads `friendly_settings`.
+    """
+
+    def __getattr__(self, attr):
+        return getattr(friendly_settings, attr)
+
+
+# Swapping the module class works on Python < 3.7, which lacks module
+# level `__getattr__`
+sys.modules[__name__].__class__ = SettingsModule
+
+
+def reload_friendly_settings(*args, **kwargs):
+    if kwargs['setting'] == 'FRIENDLY_ERRORS':
+        friendly_settings.reload()
+
+
+setting_changed.connect(reload_friendly_settings)
@@ -1,3 +1,7 @@
+from functools import lru_cache
+from string import Formatter
+
+
 def update_field_settings(setting, user_setting):
     for field in user_setting:
         field_type = setting.get(field)
@@ -15,3 +19,55 @@ def is_pretty(response):
             and isinstance(data['errors'], list):
         return True
     return False
+
+
+FRIENDLY_KEYS = frozenset(('code', 'errors'))
+
+
+def is_friendly(data):
+    """
+    Cheaper variant of `is_pretty` used on the exception handling path:
+    a friendly body is a mapping carrying the `code` and `errors` keys (and
+    `message`, unless it is compact), checked with a single subset test.
+    Field errors of DRF bodies are lists, a friendly `code` never is.
+    """
+    return isinstance(data, dict) and FRIENDLY_KEYS <= data.keys() \
+        and not isinstance(data['code'], list)
+
+
+@lru_cache(maxsize=512)
+def get_template_affixes(template):
+    """
+    Returns the literal text before the first and after the last placeholder
+    of a `str.format` template.
+    """
+    chunks = list(Formatter().parse(template))
+    if len(chunks) == 1 and chunks[0][1] is None:
+        return template, None
+    prefix = chunks[0][0]
+    suffix = chunks[-1][0] if chunks[-1][1] is None else ''
+    return prefix, suffix
+
+
+def matches_template(template, message):
+    """
+    Cheaply checks whether `message` could have been produced by formatting
+    `template`, without formatting it.
+    """
+    try:
+        prefix, suffix = get_template_affixes(str(template))
+    except ValueError:
+        return False
+    message = str(message)
+    if suffix is None:
+        return message == prefix
+    return message.startswith(prefix) and message.endswith(suffix) \
+        and len(message) >= len(prefix) + len(suffix)
+
+
+def json_pointer(*parts):
+    """
+    Builds a JSON pointer (RFC 6901) such as `/items/3/price` from path parts.
+    """
+    return ''.join('/' + str(part).replace('~', '~0').replace('/', '~1')
+                   for part in parts)
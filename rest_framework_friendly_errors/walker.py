@@ -0,0 +1,215 @@
+from __future__ import unicode_literals
+
+from itertools import islice
+
+from rest_framework.exceptions import ValidationError
+from rest_framework.fields import DictField, ListField
+from rest_framework.serializers import BaseSerializer, ListSerializer
+from rest_framework.settings import api_settings
+from rest_framework.utils.serializer_helpers import ReturnDict
+
+from . import instrumentation
+from .errors import as_compact, with_field
+from .messages import get_message
+from .responses import is_compact
+from .settings import friendly_settings
+from .utils import json_pointer
+
+
+def format_path(path):
+    """
+    Top level fields keep their plain name, nested ones are reported as
+    JSON pointers such as `/items/3/price`.
+    """
+    if not path:
+        return None
+    if len(path) == 1 and not isinstance(path[0], int):
+        return path[0]
+    return json_pointer(*path)
+
+
+def is_leaf_errors(errors):
+    return isinstance(errors, list) \
+        and all(isinstance(error, str) for error in errors)
+
+
+def get_owner(node, default):
+    """
+    Returns the friendly serializer which declares `node`, used to resolve
+    codes against its registered errors, validators and code table.
+    """
+    parent = getattr(node, 'parent', None)
+    while parent is not None:
+        if hasattr(parent, 'get_field_error_entry'):
+            return parent
+        parent = getattr(parent, 'parent', None)
+    return default
+
+
+def iter_error_entries(serializer, errors, owner=None, compact=False):
+    """
+    Flattens an arbitrarily nested DRF error structure of `serializer` into
+    friendly entries. The error tree is walked once, with an explicit stack
+    instead of recursion, and identical errors of the same field are only
+    resolved once.
+
+    `owner` is the friendly serializer used for errors which cannot be
+    attributed to a nested friendly serializer, it defaults to `serializer`.
+    With `compact` the entries carry no messages.
+    """
+    owner = serializer if owner is None else owner
+    resolved = {}
+    stack = [((), serializer, errors)]
+    while stack:
+        path, node, node_errors = stack.pop()
+        children = []
+        if path and type(path[-1]) is int:
+            restore_item_state = getattr(getattr(node, 'parent', None),
+                                         'restore_item_state', None)
+            if restore_item_state is not None:
+                restore_item_state(path[-1])
+
+        if isinstance(node, ListSerializer) and isinstance(node_errors, list) \
+                and not is_leaf_errors(node_errors):
+            children = [(path + (index,), node.child, item_errors)
+                        for index, item_errors in enumerate(node_errors)
+                        if item_errors]
+        elif isinstance(node, BaseSerializer) \
+                and isinstance(node_errors, dict):
+            serializer_owner = node.child \
+                if isinstance(node, ListSerializer) else node
+            if not hasattr(serializer_owner, 'get_non_field_error_entries'):
+                serializer_owner = owner
+            fields = getattr(node, 'fields', {})
+            for key, value in node_errors.items():
+                field = fields.get(key) \
+                    if key != api_settings.NON_FIELD_ERRORS_KEY else None
+                if field is None:
+                    if not isinstance(value, list):
+                        value = [value]
+                    for entry in serializer_owner.get_non_field_error_entries(
+                            value):
+                        if compact:
+                            entry = as_compact(entry)
+                        if path:
+                            entry['field'] = format_path(path)
+                        yield entry
+                else:
+                    children.append((path + (key,), field, value))
+        elif isinstance(node, (ListField, DictField)) \
+                and isinstance(node_errors, dict):
+            children = [(path + (key,), node.child, value)
+                        for key, value in node_errors.items()]
+        elif not path:
+            # Errors of a serializer which were not raised as a mapping
+            for entry in owner.get_non_field_error_entries(node_errors):
+                yield as_compact(entry) if compact else entry
+        else:
+            field_owner = get_owner(node, owner)
+            if not is_leaf_errors(node_errors):
+                for entry in field_owner.get_field_error_entries(node_errors,
+                                                                 node):
+                    if compact:
+                        entry = as_compact(entry)
+                    if len(path) > 1:
+                        entry['field'] = format_path(path)
+                    yield entry
+                continue
+            field_path = format_path(path)
+            for error in node_errors:
+                # The failed validator is part of the key, items of a
+                # `many=True` payload can fail the same way in different
+                # validators
+                cache_key = (id(node), str(error),
+                             getattr(error, 'code', None),
+                             id(field_owner.get_failed_validator(node, error)))
+                entry = resolved.get(cache_key)
+                if entry is not None:
+                    yield with_field(entry, field_path)
+                    continue
+                entry = field_owner.get_field_error_entry(error, node)
+                if compact:
+                    entry = as_compact(entry)
+                entry['field'] = field_path
+                resolved[cache_key] = entry
+                yield entry
+
+        stack.extend(reversed(children))
+
+
+def count_error_entries(errors):
+    """
+    Counts the entries `iter_error_entries` would yield for `errors`,
+    without resolving any of them.
+    """
+    count = 0
+    stack = [errors]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            if 'code' in node and 'message' in node:
+                count += 1
+            else:
+                stack.extend(node.values())
+        elif isinstance(node, list):
+            stack.extend(node)
+        else:
+            count += 1
+    return count
+
+
+def validate(serializer, base, source, raise_exception=False):
+    """
+    Runs DRF's `is_valid` of `base`, the `super()` of `serializer`, timed
+    under `source`. Pretty errors of a previous run are dropped.
+    """
+    serializer.__dict__.pop('_pretty_errors', None)
+    with instrumentation.timed('validate', source):
+        valid = base.is_valid()
+    if not valid and raise_exception:
+        raise ValidationError(serializer.errors)
+    return valid
+
+
+def get_pretty_errors(serializer, base):
+    """
+    Returns the pretty errors of `serializer`, built from DRF's errors of
+    `base` on first access and reused until it is validated again.
+    """
+    cached = serializer.__dict__.get('_pretty_errors')
+    if cached is not None \
+            and cached[0] is getattr(serializer, '_errors', None):
+        return cached[1]
+    pretty_errors = ReturnDict(serializer.build_pretty_errors(base.errors),
+                               serializer=serializer)
+    serializer._pretty_errors = (serializer._errors, pretty_errors)
+    return pretty_errors
+
+
+def build_pretty_errors(serializer, errors, source):
+    """
+    Builds the friendly body of `errors`, capped at `MAX_ERRORS` entries.
+    """
+    max_errors = friendly_settings.MAX_ERRORS
+    compact = is_compact(serializer.context.get('request'))
+    with instrumentation.timed('format', source):
+        pretty = list(islice(serializer.iter_pretty_errors(errors, compact),
+                             max_errors))
+    if not pretty:
+        return {}
+    if compact:
+        # No message is resolved or translated at all
+        pretty_errors = {'code': friendly_settings.VALIDATION_FAILED_CODE,
+                         'errors': pretty}
+    else:
+        pretty_errors = {'code': friendly_settings.VALIDATION_FAILED_CODE,
+                         'message': get_message(
+                             friendly_settings.VALIDATION_FAILED_MESSAGE,
+                             friendly_settings.VALIDATION_FAILED_CODE),
+                         'errors': pretty}
+    if max_errors is not None and len(pretty) == max_errors:
+        total = count_error_entries(errors)
+        if total > max_errors:
+            pretty_errors['truncated'] = True
+            pretty_errors['total_errors'] = total
+    return pretty_errors
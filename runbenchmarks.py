@@ -0,0 +1,245 @@
+#! /usr/bin/env python
+"""
+Benchmarks of the error formatting and exception handling hot paths.
+
+    python runbenchmarks.py --output results.json
+    python runbenchmarks.py --compare old.json --output new.json
+
+Every case is timed for the friendly implementation and for plain DRF as
+a baseline. Results are stored as JSON, so runs of different versions
+can be compared with `--compare`.
+"""
+from __future__ import print_function
+
+import argparse
+import json
+import platform
+import sys
+import timeit
+from datetime import datetime
+
+import django
+from django.conf import settings
+
+settings.configure(
+    SECRET_KEY='not important here',
+    INSTALLED_APPS=(
+        'django.contrib.auth',
+        'django.contrib.contenttypes',
+        'rest_framework',
+    ),
+    LANGUAGE_CODE='en',
+)
+django.setup()
+
+import rest_framework  # noqa: E402
+from rest_framework import exceptions, serializers  # noqa: E402
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+from rest_framework.views import exception_handler  # noqa: E402
+
+import rest_framework_friendly_errors  # noqa: E402
+from rest_framework_friendly_errors.handlers import (  # noqa: E402
+    friendly_exception_handler
+)
+from rest_framework_friendly_errors.mixins import (  # noqa: E402
+    FriendlyErrorMessagesMixin
+)
+
+WIDTHS = (5, 20, 50, 200)
+DENSITIES = (0.1, 0.5, 1.0)
+DEPTHS = (1, 3, 10)
+MANY_SIZES = (10, 100, 1000)
+
+
+def make_serializer_class(base, width, name):
+    attrs = {}
+    for index in range(width):
+        if index % 2:
+            attrs['field_%d' % index] = serializers.IntegerField(
+                max_value=100)
+        else:
+            attrs['field_%d' % index] = serializers.CharField(max_length=5)
+    return type(name, base, attrs)
+
+
+def make_data(width, density):
+    invalid = int(round(width * density))
+    data = {}
+    for index in range(width):
+        if index % 2:
+            data['field_%d' % index] = 1000 if index < invalid else 10
+        else:
+            data['field_%d' % index] = 'x' * 10 if index < invalid else 'x'
+    return data
+
+
+def make_nested_class(base, depth, name):
+    serializer_class = type('%s0' % name, base,
+                            {'value': serializers.IntegerField()})
+    for level in range(1, depth):
+        serializer_class = type('%s%d' % (name, level), base, {
+            'value': serializers.IntegerField(),
+            'child': serializer_class(),
+        })
+    return serializer_class
+
+
+def make_nested_data(depth):
+    data = {'value': 'x'}
+    for _ in range(1, depth):
+        data = {'value': 'x', 'child': data}
+    return data
+
+
+FRIENDLY = (FriendlyErrorMessagesMixin, serializers.Serializer)
+PLAIN = (serializers.Serializer,)
+
+
+def strip_codes(errors):
+    """
+    Replaces `ErrorDetail` instances with plain strings, the way errors
+    built by older code or third party validators look.
+    """
+    if isinstance(errors, dict):
+        return {key: strip_codes(value) for key, value in errors.items()}
+    if isinstance(errors, list):
+        return [strip_codes(value) for value in errors]
+    return str(errors)
+
+
+def validate(serializer_class, data, **kwargs):
+    def run():
+        serializer = serializer_class(data=data, **kwargs)
+        serializer.is_valid()
+        return serializer.errors
+    return run
+
+
+def build_pretty_errors(serializer_class, data, template_only, **kwargs):
+    serializer = serializer_class(data=data, **kwargs)
+    serializer.is_valid()
+    errors = serializer._errors
+    if template_only:
+        errors = strip_codes(errors)
+    return lambda: serializer.build_pretty_errors(errors)
+
+
+def handle(handler, exc_factory):
+    def run():
+        response = handler(exc_factory(), {})
+        response.accepted_renderer = JSONRenderer()
+        response.accepted_media_type = 'application/json'
+        response.renderer_context = {}
+        return response.rendered_content
+    return run
+
+
+def iter_cases():
+    for width in WIDTHS:
+        friendly = make_serializer_class(FRIENDLY, width, 'Friendly%d' % width)
+        plain = make_serializer_class(PLAIN, width, 'Plain%d' % width)
+        for density in DENSITIES:
+            data = make_data(width, density)
+            params = {'width': width, 'density': density}
+            yield ('validate', params, validate(friendly, data),
+                   validate(plain, data))
+            for template_only in (False, True):
+                yield ('build_pretty_errors',
+                       dict(params, template_only=template_only),
+                       build_pretty_errors(friendly, data, template_only),
+                       None)
+
+    for depth in DEPTHS:
+        friendly = make_nested_class(FRIENDLY, depth, 'FriendlyNested')
+        plain = make_nested_class(PLAIN, depth, 'PlainNested')
+        data = make_nested_data(depth)
+        yield ('validate_nested', {'depth': depth}, validate(friendly, data),
+               validate(plain, data))
+
+    friendly = make_serializer_class(FRIENDLY, 5, 'FriendlyItem')
+    plain = make_serializer_class(PLAIN, 5, 'PlainItem')
+    for size in MANY_SIZES:
+        data = [make_data(5, 0.5)] * size
+        yield ('validate_many', {'many': size},
+               validate(friendly, data, many=True),
+               validate(plain, data, many=True))
+
+    exception_factories = {
+        'NotFound': exceptions.NotFound,
+        'Throttled': lambda: exceptions.Throttled(wait=30),
+        'ValidationError': lambda: exceptions.ValidationError(
+            {'title': ['This field is required.']}),
+    }
+    for name, exc_factory in sorted(exception_factories.items()):
+        yield ('exception_handler', {'exception': name},
+               handle(friendly_exception_handler, exc_factory),
+               handle(exception_handler, exc_factory))
+
+
+def measure(func, repeat):
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    timings = [timing / number for timing in timer.repeat(repeat, number)]
+    return {'best': min(timings), 'mean': sum(timings) / len(timings),
+            'number': number}
+
+
+def case_key(result):
+    return json.dumps([result['name'], result['params']], sort_keys=True)
+
+
+def run(repeat):
+    results = []
+    for name, params, friendly, baseline in iter_cases():
+        result = {'name': name, 'params': params,
+                  'friendly': measure(friendly, repeat)}
+        if baseline is not None:
+            result['baseline'] = measure(baseline, repeat)
+            result['ratio'] = result['friendly']['best'] / \
+                result['baseline']['best']
+        results.append(result)
+        print('%-20s %-50s %10.1f us%s' % (
+            name, json.dumps(params, sort_keys=True),
+            result['friendly']['best'] * 1e6,
+            ' (x%.2f DRF)' % result['ratio'] if 'ratio' in result else ''))
+    return results
+
+
+def compare(results, previous):
+    previous = {case_key(result): result for result in previous['results']}
+    print('\nChange against previous run:')
+    for result in results:
+        old = previous.get(case_key(result))
+        if old is None:
+            continue
+        change = result['friendly']['best'] / old['friendly']['best'] - 1
+        print('%-20s %-50s %+7.1f%%' % (
+            result['name'], json.dumps(result['params'], sort_keys=True),
+            change * 100))
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--output', help='file to store JSON results in')
+    parser.add_argument('--compare', help='JSON results of a previous run')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    results = run(args.repeat)
+    if args.compare:
+        with open(args.compare) as previous:
+            compare(results, json.load(previous))
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump({
+                'version': rest_framework_friendly_errors.__version__,
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'rest_framework': rest_framework.VERSION,
+                'date': datetime.now().isoformat(),
+                'results': results,
+            }, output, indent=2, sort_keys=True)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -243,3 +243,47 @@ class FieldModelSerializer(FriendlyErrorMessagesMixin,
     class Meta:
         model = Field
         fields = ['label', 'options']
+
+
+class SnippetCollectionSerializer(FriendlyErrorMessagesMixin,
+                                  serializers.Serializer):
+    snippets = serializers.PrimaryKeyRelatedField(
+        queryset=Snippet.objects.all(), many=True)
+    titles = serializers.SlugRelatedField(
+        queryset=Snippet.objects.all(), slug_field='title', many=True,
+        required=False)
+
+
+class CustomMessageCollectionSerializer(FriendlyErrorMessagesMixin,
+                                        serializers.Serializer):
+    snippets = serializers.PrimaryKeyRelatedField(
+        queryset=Snippet.objects.all(), many=True,
+        error_messages={'does_not_exist': 'Unknown snippet.'})
+
+
+def is_not_negative(value):
+    if value < 0:
+        raise ValidationError('Value out of range')
+
+
+class ItemSerializer(FriendlyErrorMessagesMixin, serializers.Serializer):
+    """
+    Serializer to test that validation state of one item does not leak into
+    other items of a `many=True` payload
+    """
+    n = serializers.IntegerField(validators=[is_not_negative])
+
+    def validate_n(self, value):
+        if value > 100:
+            raise ValidationError('Value out of range')
+        return value
+
+    def validate(self, attrs):
+        if attrs['n'] == 1:
+            self.register_error('One is not allowed', error_code=7001)
+        elif attrs['n'] % 2 == 0:
+            self.register_error('Even %d' % attrs['n'], field_name='n',
+                                error_code=7000)
+        return attrs
+
+    FIELD_VALIDATION_ERRORS = {'is_not_negative': 5010, 'validate_n': 5011}
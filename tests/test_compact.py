@@ -0,0 +1,130 @@
+import json
+from unittest import mock
+
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory
+
+from rest_framework_friendly_errors import responses, settings
+from rest_framework_friendly_errors.errors import as_compact, error_entry
+from rest_framework_friendly_errors.handlers import friendly_exception_handler
+from rest_framework_friendly_errors.renderers import FriendlyJSONRenderer
+from rest_framework_friendly_errors.responses import is_compact
+
+from . import BaseTestCase
+from .serializers import SnippetModelSerializer, SnippetSerializer
+from .utils import run_is_valid
+from .views import SnippetList
+
+COMPACT_MEDIA_TYPE = 'application/json; errors=compact'
+
+
+class CompactRequest(object):
+    accepted_media_type = COMPACT_MEDIA_TYPE
+
+
+class IsCompactTestCase(BaseTestCase):
+
+    def test_negotiated_with_accept_parameter(self):
+        self.assertFalse(is_compact())
+        self.assertTrue(is_compact(CompactRequest()))
+        with override_settings(FRIENDLY_ERRORS={'COMPACT_ERRORS': True}):
+            self.assertTrue(is_compact())
+            request = CompactRequest()
+            request.accepted_media_type = 'application/json; errors=full'
+            self.assertFalse(is_compact(request))
+
+    def test_bytes_parameters(self):
+        media_type = mock.Mock(params={'errors': b'compact'})
+        with mock.patch.object(responses, '_MediaType',
+                               return_value=media_type):
+            self.assertTrue(is_compact(CompactRequest()))
+
+
+class CompactSerializerTestCase(BaseTestCase):
+
+    def setUp(self):
+        super(CompactSerializerTestCase, self).setUp()
+        self.data_set.update({'linenos': 'A text instead of a bool',
+                              'title': ''})
+
+    def test_entries_carry_codes_and_fields_only(self):
+        full = run_is_valid(SnippetSerializer, data=self.data_set).errors
+        s = SnippetSerializer(data=self.data_set,
+                              context={'request': CompactRequest()})
+        s.is_valid()
+        self.assertEqual(s.errors, {
+            'code': settings.VALIDATION_FAILED_CODE,
+            'errors': [{'code': error['code'], 'field': error['field']}
+                       for error in full['errors']]})
+
+    def test_many(self):
+        s = SnippetSerializer(data=[self.data_set] * 2, many=True,
+                              context={'request': CompactRequest()})
+        s.is_valid()
+        self.assertNotIn('message', s.errors)
+        self.assertEqual([error['field'] for error in s.errors['errors']],
+                         ['/0/title', '/0/linenos', '/1/title', '/1/linenos'])
+        self.assertTrue(all('message' not in error
+                            for error in s.errors['errors']))
+
+    def test_view_with_accept_parameter(self):
+        factory = APIRequestFactory()
+        request = factory.post(reverse('api:snippet-list'),
+                               data=self.data_set,
+                               HTTP_ACCEPT=COMPACT_MEDIA_TYPE)
+        response = SnippetList.as_view()(request)
+        response.render()
+        body = json.loads(response.content.decode())
+        self.assertNotIn('message', body)
+        self.assertEqual({error['field'] for error in body['errors']},
+                         {'title', 'linenos'})
+        self.assertTrue(all(set(error) == {'code', 'field'}
+                            for error in body['errors']))
+
+
+class CompactExceptionHandlerTestCase(BaseTestCase):
+
+    def handle(self, exc):
+        response = friendly_exception_handler(
+            exc, {'request': CompactRequest()})
+        response.accepted_renderer = JSONRenderer()
+        response.accepted_media_type = COMPACT_MEDIA_TYPE
+        response.renderer_context = {}
+        response.render()
+        return json.loads(response.content.decode())
+
+    def test_simple_exception(self):
+        self.assertEqual(self.handle(NotFound()), {
+            'code': settings.DEFAULT_EXCEPTION_DICT[
+                'rest_framework.exceptions.NotFound'],
+            'status_code': 404, 'errors': [{'field': 'detail'}]})
+
+    def test_detail_fields(self):
+        body = self.handle(ValidationError({'title': ['Required.']}))
+        self.assertNotIn('message', body)
+        self.assertEqual(body['errors'], [{'field': 'title'}])
+
+    def test_friendly_errors_raised_without_request(self):
+        self.data_set['linenos'] = 'A text instead of a bool'
+        s = SnippetModelSerializer(data=self.data_set)
+        with self.assertRaises(ValidationError) as context:
+            s.is_valid(raise_exception=True)
+        body = self.handle(context.exception)
+        self.assertNotIn('message', body)
+        self.assertEqual(body['errors'][0]['field'], 'linenos')
+        self.assertNotIn('message', body['errors'][0])
+
+
+class CompactRendererTestCase(BaseTestCase):
+
+    def test_renders_like_json_renderer(self):
+        body = {'code': 1000,
+                'errors': [as_compact(error_entry(1, 'a', None)),
+                           as_compact(error_entry(2, None, 'b')),
+                           as_compact(error_entry(3, 'c', 'd',
+                                                  meta={'missing': [1]}))]}
+        self.assertEqual(FriendlyJSONRenderer().render(body),
+                         JSONRenderer().render(body))
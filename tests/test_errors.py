@@ -0,0 +1,54 @@
+import json
+from unittest import TestCase
+
+from rest_framework.exceptions import ValidationError
+
+from rest_framework_friendly_errors.errors import error_entry, with_field
+
+from . import BaseTestCase
+from .serializers import SnippetSerializer
+
+
+class ErrorEntryTestCase(TestCase):
+
+    def test_meta_is_only_set_when_given(self):
+        self.assertEqual(error_entry(2011, 'linenos', 'Invalid'),
+                         {'code': 2011, 'field': 'linenos',
+                          'message': 'Invalid'})
+        self.assertEqual(error_entry(2011, 'a', 'b', {'missing': [1]})['meta'],
+                         {'missing': [1]})
+
+    def test_with_field_returns_a_copy(self):
+        error = error_entry(2011, 'linenos', 'Invalid')
+        self.assertEqual(with_field(error, '/0/linenos')['field'],
+                         '/0/linenos')
+        self.assertEqual(error['field'], 'linenos')
+
+
+class PublicErrorsTestCase(BaseTestCase):
+
+    def test_errors_are_plain_dicts(self):
+        self.data_set['linenos'] = 'A text instead of a bool'
+        s = SnippetSerializer(data=self.data_set)
+        s.is_valid()
+        self.assertTrue(all(type(error) is dict
+                            for error in s.errors['errors']))
+        self.assertEqual(json.loads(json.dumps(s.errors)), s.errors)
+
+    def test_raised_errors_are_plain_dicts(self):
+        self.data_set['linenos'] = 'A text instead of a bool'
+        s = SnippetSerializer(data=self.data_set)
+        with self.assertRaises(ValidationError) as context:
+            s.is_valid(raise_exception=True)
+        error = context.exception.detail['errors'][0]
+        self.assertIsInstance(error, dict)
+        self.assertEqual(error['field'], 'linenos')
+
+    def test_identical_errors_get_their_own_entries(self):
+        self.data_set['linenos'] = 'A text instead of a bool'
+        s = SnippetSerializer(data=[self.data_set] * 2, many=True)
+        s.is_valid()
+        first, second = s.errors['errors']
+        self.assertEqual(first['message'], second['message'])
+        self.assertEqual((first['field'], second['field']),
+                         ('/0/linenos', '/1/linenos'))
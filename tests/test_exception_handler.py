@@ -1,12 +1,38 @@
+import json
+from unittest import mock
+
+from django.core.exceptions import PermissionDenied
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.http import Http404
+from django.test import override_settings
 from django.urls import reverse
+from rest_framework.exceptions import NotFound, Throttled
+from rest_framework.renderers import JSONRenderer
 from rest_framework.test import APIRequestFactory
 
 from rest_framework_friendly_errors import settings
+from rest_framework_friendly_errors.codes import (
+    clear_error_code_tables, get_exception_code
+)
+from rest_framework_friendly_errors.handlers import friendly_exception_handler
+from rest_framework_friendly_errors.responses import get_encoded_body
 
 from . import BaseTestCase
 from .views import SnippetList
 
 
+class GoneError(NotFound):
+    pass
+
+
+# An application exception which merely shares the name of a DRF exception
+AppNotFound = type('NotFound', (Exception,), {})
+
+
+def default_code(name):
+    return settings.DEFAULT_EXCEPTION_DICT['rest_framework.exceptions.' + name]
+
+
 class ExceptionHandlerTestCase(BaseTestCase):
     def setUp(self):
         super(ExceptionHandlerTestCase, self).setUp()
@@ -18,7 +44,7 @@ class ExceptionHandlerTestCase(BaseTestCase):
         self.assertEqual(response.data['message'], 'APIException')
         self.assertEqual(response.data['status_code'], 500)
         self.assertEqual(response.data['code'],
-                         settings.FRIENDLY_EXCEPTION_DICT.get('APIException'))
+                         default_code('APIException'))
 
     def test_handler_do_not_touch_pretty_errors(self):
         self.data_set['language'] = 'node.js'
@@ -32,7 +58,7 @@ class ExceptionHandlerTestCase(BaseTestCase):
         self.assertEqual(response.status_code, 404)
         self.assertEqual(response.data['status_code'], 404)
         self.assertEqual(response.data['code'],
-                         settings.FRIENDLY_EXCEPTION_DICT.get('NotFound'))
+                         default_code('NotFound'))
 
     def test_method_not_allowed(self):
         response = self.client.get(reverse('api:not-allowed'))
@@ -40,7 +66,7 @@ class ExceptionHandlerTestCase(BaseTestCase):
         self.assertEqual(response.data['status_code'], 405)
         self.assertEqual(
             response.data['code'],
-            settings.FRIENDLY_EXCEPTION_DICT.get('MethodNotAllowed')
+            default_code('MethodNotAllowed')
         )
 
     def test_not_authenticated(self):
@@ -49,5 +75,129 @@ class ExceptionHandlerTestCase(BaseTestCase):
         self.assertEqual(response.data['status_code'], 403)
         self.assertEqual(
             response.data['code'],
-            settings.FRIENDLY_EXCEPTION_DICT.get('NotAuthenticated')
+            default_code('NotAuthenticated')
         )
+
+    def test_unhandled_exception_is_ignored(self):
+        self.assertIsNone(friendly_exception_handler(ValueError('boom'), {}))
+
+    def test_catch_all_exceptions(self):
+        with mock.patch.object(settings.friendly_settings,
+                               'CATCH_ALL_EXCEPTIONS', True):
+            response = friendly_exception_handler(ValueError('boom'), {})
+        self.assertEqual(response.status_code, 500)
+        self.assertEqual(response.data['message'], 'boom')
+        self.assertEqual(response.data['code'],
+                         default_code('APIException'))
+
+    def test_catch_all_exceptions_use_the_api_exception_code(self):
+        with mock.patch.object(settings.friendly_settings,
+                               'CATCH_ALL_EXCEPTIONS', True):
+            for exc in (DjangoValidationError('boom'), AppNotFound('boom')):
+                response = friendly_exception_handler(exc, {})
+                self.assertEqual(response.status_code, 500)
+                self.assertEqual(response.data['code'],
+                                 default_code('APIException'))
+
+    def test_throttled_headers(self):
+        response = friendly_exception_handler(Throttled(wait=30), {})
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '30')
+        self.assertEqual(response.data['code'],
+                         default_code('Throttled'))
+
+
+class ExceptionCodeTestCase(BaseTestCase):
+
+    def tearDown(self):
+        clear_error_code_tables()
+        super(ExceptionCodeTestCase, self).tearDown()
+
+    def test_subclass_inherits_code(self):
+        response = friendly_exception_handler(GoneError(), {})
+        self.assertEqual(response.data['code'],
+                         default_code('NotFound'))
+
+    def test_dotted_path_and_class_keys(self):
+        dotted = '%s.GoneError' % __name__
+        with mock.patch.dict(settings.FRIENDLY_EXCEPTION_DICT, {dotted: 1}):
+            clear_error_code_tables()
+            self.assertEqual(get_exception_code(GoneError), 1)
+        with mock.patch.dict(settings.FRIENDLY_EXCEPTION_DICT,
+                             {GoneError: 2}):
+            clear_error_code_tables()
+            self.assertEqual(get_exception_code(GoneError), 2)
+
+    def test_unknown_exception_has_no_code(self):
+        self.assertIsNone(get_exception_code(ValueError))
+        self.assertIsNone(get_exception_code(AppNotFound))
+
+    def test_django_exceptions(self):
+        self.assertEqual(get_exception_code(Http404), default_code('NotFound'))
+        self.assertEqual(get_exception_code(PermissionDenied),
+                         default_code('PermissionDenied'))
+        self.assertIsNone(get_exception_code(DjangoValidationError))
+
+    def test_class_names_only_match_the_exact_class(self):
+        user_settings = {'EXCEPTION_DICT': {'NotFound': 1}}
+        with override_settings(FRIENDLY_ERRORS=user_settings):
+            self.assertEqual(get_exception_code(NotFound), 1)
+            self.assertEqual(get_exception_code(GoneError),
+                             default_code('NotFound'))
+            self.assertEqual(get_exception_code(AppNotFound), 1)
+            self.assertIsNone(
+                get_exception_code(AppNotFound, match_name=False))
+
+
+class PrebuiltBodyTestCase(BaseTestCase):
+
+    def render(self, exc, renderer=None, change=None):
+        response = friendly_exception_handler(exc, {})
+        if change is not None:
+            change(response.data)
+        response.accepted_renderer = renderer or JSONRenderer()
+        response.accepted_media_type = 'application/json'
+        response.renderer_context = {}
+        response.render()
+        return response
+
+    def test_body_matches_data(self):
+        response = self.client.get(reverse('api:not-found'))
+        self.assertEqual(json.loads(response.content.decode()),
+                         json.loads(json.dumps(response.data)))
+        self.assertEqual(response['Content-Type'], 'application/json')
+
+    def test_data_is_built_only_when_read(self):
+        response = self.render(NotFound())
+        self.assertIsNone(response.__dict__['_data'])
+        self.assertEqual(json.loads(response.content.decode()),
+                         response.data)
+
+    def test_changed_data_is_rendered(self):
+        response = self.render(
+            NotFound(), change=lambda data: data.update(request_id='abc'))
+        self.assertEqual(json.loads(response.content.decode())['request_id'],
+                         'abc')
+
+    def test_renderer_subclasses_get_the_full_context(self):
+        class ResponseRenderer(JSONRenderer):
+            def render(self, data, accepted_media_type=None,
+                       renderer_context=None):
+                data = dict(data,
+                            status=renderer_context['response'].status_code)
+                return super(ResponseRenderer, self).render(
+                    data, accepted_media_type, renderer_context)
+
+        response = self.render(NotFound(), ResponseRenderer())
+        self.assertEqual(json.loads(response.content.decode())['status'],
+                         404)
+
+    def test_throttle_wait_is_patched_in(self):
+        get_encoded_body.cache_clear()
+        for wait in (30, 45):
+            response = self.render(Throttled(wait=wait))
+            body = json.loads(response.content.decode())
+            self.assertEqual(body['message'], response.data['message'])
+            self.assertIn(str(wait), body['errors'][0]['message'])
+        self.assertEqual(get_encoded_body.cache_info().misses, 1)
+        self.assertEqual(get_encoded_body.cache_info().hits, 1)
@@ -0,0 +1,86 @@
+from datetime import timezone
+from unittest import TestCase, mock
+
+from django.core.files.uploadedfile import UploadedFile
+from rest_framework import serializers
+
+from rest_framework_friendly_errors.field_map import (
+    MISCELLANEOUS, NUMERIC, RELATION, STRING, FieldMap, MessageIndex,
+    get_field_category
+)
+
+
+class UpperCharField(serializers.CharField):
+    pass
+
+
+class CustomPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    pass
+
+
+class FieldCategoryTestCase(TestCase):
+
+    def test_builtin_field_category(self):
+        self.assertIs(get_field_category(serializers.CharField), STRING)
+        self.assertIs(get_field_category(serializers.DecimalField), NUMERIC)
+
+    def test_subclass_inherits_category(self):
+        self.assertIs(get_field_category(UpperCharField), STRING)
+        self.assertIs(get_field_category(CustomPrimaryKeyRelatedField),
+                      RELATION)
+
+    def test_unknown_field_category(self):
+        self.assertIs(get_field_category(serializers.Field), MISCELLANEOUS)
+
+
+class FieldKwargsTestCase(TestCase):
+
+    def test_static_kwargs_are_cached_per_field(self):
+        field = serializers.DecimalField(max_digits=5, decimal_places=2)
+        kwargs = FieldMap().get_field_kwargs(field, 'text')
+        self.assertEqual(kwargs['max_whole_digits'], 3)
+        self.assertEqual(kwargs['data_type'], 'str')
+        self.assertIs(field._friendly_static_kwargs,
+                      field._friendly_static_kwargs)
+
+        field.max_digits = 10
+        kwargs = FieldMap().get_field_kwargs(field, 1)
+        self.assertEqual(kwargs['max_digits'], 5)
+        self.assertEqual(kwargs['data_type'], 'int')
+
+    def test_field_timezone_is_used_as_is(self):
+        field = serializers.DateTimeField(default_timezone=timezone.utc)
+        kwargs = FieldMap().get_field_kwargs(field, 'text')
+        self.assertIs(kwargs['timezone'], timezone.utc)
+
+    def test_file_kwargs_do_not_read_the_upload(self):
+        upload = mock.Mock(spec=UploadedFile)
+        upload.name = 'report.pdf'
+        upload.size = 2048
+        field = serializers.FileField(max_length=5)
+        kwargs = FieldMap().get_field_kwargs(field, upload)
+        self.assertEqual(kwargs['length'], 10)
+        self.assertEqual(kwargs['name'], 'report.pdf')
+        self.assertEqual(kwargs['size'], 2048)
+        self.assertEqual(upload.mock_calls, [])
+
+
+class MessageIndexTestCase(TestCase):
+
+    def setUp(self):
+        self.index = MessageIndex({
+            'blank': 'This field may not be blank.',
+            'max_length': 'No more than {max_length} characters.',
+            'min_length': 'No less than {min_length} characters.',
+        })
+
+    def test_exact_message(self):
+        self.assertEqual(self.index.find('This field may not be blank.'),
+                         (('blank', {}),))
+
+    def test_template_message(self):
+        self.assertEqual(self.index.find('No more than 10 characters.'),
+                         (('max_length', {'max_length': '10'}),))
+
+    def test_unknown_message(self):
+        self.assertEqual(self.index.find('Incorrect title'), ())
@@ -0,0 +1,66 @@
+from rest_framework.exceptions import NotFound
+
+from rest_framework_friendly_errors import instrumentation
+from rest_framework_friendly_errors.handlers import friendly_exception_handler
+
+from . import BaseTestCase
+from .serializers import SnippetSerializer
+from .utils import run_is_valid
+
+
+class InstrumentationTestCase(BaseTestCase):
+
+    def setUp(self):
+        super(InstrumentationTestCase, self).setUp()
+        self.registry = instrumentation.add_sink(
+            instrumentation.MemoryRegistry())
+
+    def tearDown(self):
+        instrumentation.remove_sink(self.registry)
+        super(InstrumentationTestCase, self).tearDown()
+
+    def test_resolution_paths(self):
+        self.data_set.update({'linenos': 'A text instead of a bool',
+                              'title': 'small title',
+                              'comment': 'lowercase'})
+        run_is_valid(SnippetSerializer, data=self.data_set).errors
+        counters = self.registry.snapshot()['counters']
+        source = 'SnippetSerializer'
+        self.assertEqual(counters[('resolution.code', source, 'linenos')], 1)
+        self.assertEqual(
+            counters[('resolution.validator', source, 'title')], 1)
+        self.assertEqual(
+            counters[('resolution.validate_method', source, 'comment')], 1)
+
+    def test_stage_timings(self):
+        self.data_set['linenos'] = 'A text instead of a bool'
+        run_is_valid(SnippetSerializer, data=self.data_set).errors
+        timings = self.registry.snapshot()['timings']
+        for stage in ('validate', 'format'):
+            count, total, longest = timings[(stage, 'SnippetSerializer')]
+            self.assertEqual(count, 1)
+            self.assertGreaterEqual(total, longest)
+
+    def test_exception_handler(self):
+        friendly_exception_handler(NotFound(), {})
+        snapshot = self.registry.snapshot()
+        self.assertEqual(snapshot['counters'][
+            ('exception_handler.prebuilt', 'NotFound', None)], 1)
+        self.assertIn(('exception_handler', 'NotFound'), snapshot['timings'])
+
+    def test_logging_sink(self):
+        sink = instrumentation.add_sink(instrumentation.LoggingSink())
+        try:
+            with self.assertLogs(instrumentation.__name__, 'DEBUG') as logs:
+                friendly_exception_handler(NotFound(), {})
+        finally:
+            instrumentation.remove_sink(sink)
+        self.assertEqual(len(logs.output), 2)
+
+    def test_nothing_recorded_without_sinks(self):
+        instrumentation.remove_sink(self.registry)
+        self.assertIs(instrumentation.timed('format'),
+                      instrumentation.NULL_TIMER)
+        friendly_exception_handler(NotFound(), {})
+        self.assertEqual(self.registry.snapshot(),
+                         {'counters': {}, 'timings': {}})
@@ -0,0 +1,63 @@
+from pathlib import Path
+from unittest import mock, skipIf
+
+from django.test import override_settings
+from django.utils import translation
+from django.utils.functional import lazy
+from django.utils.translation import gettext_lazy
+
+from rest_framework_friendly_errors import messages, settings
+from rest_framework_friendly_errors.messages import file_changed, get_message
+
+from . import BaseTestCase
+from .serializers import SnippetSerializer
+from .utils import run_is_valid
+
+
+class GetMessageTestCase(BaseTestCase):
+
+    def setUp(self):
+        super(GetMessageTestCase, self).setUp()
+        messages.clear_messages()
+        self.message = gettext_lazy('This field is required.')
+
+    def test_plain_strings_are_returned_as_they_are(self):
+        message = 'Not translated'
+        self.assertIs(get_message(message), message)
+
+    def test_lazy_message_is_resolved_once_per_language(self):
+        gettext = mock.Mock(wraps=translation.gettext)
+        message = lazy(gettext, str)('This field is required.')
+        for language in ('en', 'pl'):
+            with translation.override(language):
+                expected = translation.gettext('This field is required.')
+                self.assertEqual(get_message(message), expected)
+                self.assertEqual(get_message(message), expected)
+        self.assertEqual(gettext.call_count, 2)
+
+    def test_replaced_message_under_same_key(self):
+        other = gettext_lazy('Not found.')
+        self.assertEqual(get_message(self.message, 1), str(self.message))
+        self.assertEqual(get_message(other, 1), str(other))
+
+    @skipIf(file_changed is None, 'file_changed needs Django 2.2')
+    def test_cleared_when_catalogs_change(self):
+        get_message(self.message)
+        file_changed.send(sender=None, file_path=Path('locale/pl/x.po'))
+        self.assertTrue(messages._messages)
+        file_changed.send(sender=None, file_path=Path('locale/pl/x.mo'))
+        self.assertFalse(messages._messages)
+
+    def test_cleared_when_language_settings_change(self):
+        get_message(self.message)
+        with override_settings(LANGUAGE_CODE='pl'):
+            self.assertFalse(messages._messages)
+
+    def test_validation_failed_message(self):
+        self.data_set['linenos'] = 'A text instead of a bool'
+        for language in ('en', 'pl'):
+            with translation.override(language):
+                s = run_is_valid(SnippetSerializer, data=self.data_set)
+                self.assertIs(type(s.errors['message']), str)
+                self.assertEqual(s.errors['message'],
+                                 str(settings.VALIDATION_FAILED_MESSAGE))
@@ -1,10 +1,14 @@
 from rest_framework_friendly_errors.settings import (
-    FRIENDLY_FIELD_ERRORS, FRIENDLY_NON_FIELD_ERRORS
+    FRIENDLY_FIELD_ERRORS, FRIENDLY_NON_FIELD_ERRORS,
+    FRIENDLY_VALIDATOR_ERRORS
 )
 
 from . import BaseTestCase
+from .models import Snippet
 from .serializers import (
-    AnotherSnippetModelSerializer, SnippetModelSerializer,
+    AnotherSnippetModelSerializer, CustomMessageCollectionSerializer,
+    FieldModelSerializer, FieldOptionModelSerializer,
+    SnippetCollectionSerializer, SnippetModelSerializer,
     ThirdSnippetModelSerializer
 )
 from .utils import run_is_valid
@@ -200,23 +204,69 @@ class SnippetModelSerializerTestCase(BaseTestCase):
 
 
 class FieldAndFieldOptionModelSerializerTestCase(BaseTestCase):
-    pass
-    # Nested Object Pendent
-
-    # def test_unique_failed_from_nested_serializer(self):
-    #     field_serializer = FieldModelSerializer(data={'label': 'test'})
-    #     self.assertTrue(field_serializer.is_valid())
-    #     field = field_serializer.save()
-    #
-    #     field_option_serializer = FieldOptionModelSerializer(
-    #         data={'value': 1}, context={'field': field})
-    #     self.assertTrue(field_option_serializer.is_valid())
-    #     field_option_serializer.save()
-    #
-    #     data_set = {'label': 'test', 'options': [{'value': 1}]}
-    #     s = run_is_valid(FieldModelSerializer, data=data_set)
-    #     code = FRIENDLY_VALIDATOR_ERRORS['UniqueValidator']
-    #     self.assertIsNotNone(s.errors['errors'])
-    #     self.assertEqual(type(s.errors['errors']), list)
-    #     self.assertEqual(errors[0]['code'], code)
-    #     self.assertEqual(s.errors['errors'][0]['field'], 'value')
+
+    def test_unique_failed_from_nested_serializer(self):
+        field_serializer = FieldModelSerializer(data={'label': 'test'})
+        self.assertTrue(field_serializer.is_valid())
+        field = field_serializer.save()
+
+        field_option_serializer = FieldOptionModelSerializer(
+            data={'value': 1}, context={'field': field})
+        self.assertTrue(field_option_serializer.is_valid())
+        field_option_serializer.save()
+
+        data_set = {'label': 'test', 'options': [{'value': 2}, {'value': 1}]}
+        s = run_is_valid(FieldModelSerializer, data=data_set)
+        code = FRIENDLY_VALIDATOR_ERRORS['UniqueValidator']
+        errors = s.errors['errors']
+        self.assertEqual(len(errors), 1)
+        self.assertEqual(errors[0]['code'], code)
+        self.assertEqual(errors[0]['field'], '/options/1/value')
+
+
+class ManyRelatedFieldTestCase(BaseTestCase):
+
+    def setUp(self):
+        super(ManyRelatedFieldTestCase, self).setUp()
+        self.snippet = Snippet.objects.create(**self.data_set)
+
+    def test_missing_pks_are_reported_in_meta(self):
+        data = {'snippets': [self.snippet.pk, 100, 101, 100]}
+        s = run_is_valid(SnippetCollectionSerializer, data=data)
+        with self.assertNumQueries(1):
+            errors = s.errors['errors']
+        code = FRIENDLY_FIELD_ERRORS['ManyRelatedField']['does_not_exist']
+        self.assertEqual(len(errors), 1)
+        self.assertEqual(errors[0]['code'], code)
+        self.assertEqual(errors[0]['field'], 'snippets')
+        self.assertEqual(errors[0]['meta'], {'missing': [100, 101]})
+
+    def test_values_are_compared_as_stored(self):
+        data = {'snippets': ['0%d' % self.snippet.pk, 100, '100']}
+        s = run_is_valid(SnippetCollectionSerializer, data=data)
+        self.assertEqual(s.errors['errors'][0]['meta'], {'missing': [100]})
+
+    def test_missing_slugs_are_reported_in_meta(self):
+        data = {'snippets': [self.snippet.pk],
+                'titles': ['Unknown', self.snippet.title, 'Other']}
+        s = run_is_valid(SnippetCollectionSerializer, data=data)
+        errors = s.errors['errors']
+        self.assertEqual(errors[0]['field'], 'titles')
+        self.assertEqual(errors[0]['meta'],
+                         {'missing': ['Unknown', 'Other']})
+
+    def test_unqueryable_values_fall_back_to_reported_value(self):
+        data = {'snippets': [100, 'text']}
+        s = run_is_valid(SnippetCollectionSerializer, data=data)
+        self.assertEqual(s.errors['errors'][0]['meta'], {'missing': [100]})
+        data = {'snippets': ['100', 'text']}
+        s = run_is_valid(SnippetCollectionSerializer, data=data)
+        self.assertEqual(s.errors['errors'][0]['meta'],
+                         {'missing': ['100']})
+
+    def test_unattributable_values_are_left_out(self):
+        data = {'snippets': [100, 'text']}
+        s = run_is_valid(CustomMessageCollectionSerializer, data=data)
+        error = s.errors['errors'][0]
+        self.assertEqual(error['message'], 'Unknown snippet.')
+        self.assertNotIn('meta', error)
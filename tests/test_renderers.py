@@ -0,0 +1,94 @@
+import json
+from unittest import mock
+
+from django.urls import reverse
+from django.utils import translation
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory
+
+from rest_framework_friendly_errors.errors import error_entry
+from rest_framework_friendly_errors.renderers import (
+    FriendlyJSONRenderer, _encode_value
+)
+
+from . import BaseTestCase
+from .serializers import SnippetSerializer
+from .utils import run_is_valid
+from .views import SnippetList
+
+
+class FriendlyJSONRendererTestCase(BaseTestCase):
+
+    def setUp(self):
+        super(FriendlyJSONRendererTestCase, self).setUp()
+        self.data_set.update({'linenos': 'A text instead of a bool',
+                              'title': 'small title'})
+        self.errors = run_is_valid(SnippetSerializer,
+                                   data=self.data_set).errors
+
+    def assertRendersLikeJSONRenderer(self, data, media_type=None):
+        self.assertEqual(FriendlyJSONRenderer().render(data, media_type),
+                         JSONRenderer().render(data, media_type))
+
+    def test_validation_errors(self):
+        self.assertRendersLikeJSONRenderer(self.errors)
+
+    def test_translated_errors(self):
+        with translation.override('pl'):
+            errors = run_is_valid(SnippetSerializer,
+                                  data=self.data_set).errors
+            self.assertRendersLikeJSONRenderer(errors)
+
+    def test_special_values(self):
+        entries = (
+            [error_entry(1, 'Zażółć\u2028', 'b\u2029'),
+             error_entry('x', None, {'nested': 'message'}),
+             error_entry(2, 'a', ['c']), error_entry(1, 'd', 'b\u2029')],
+            [{'code': 1, 'field': 'a'}, {'code': 1, 'field': None}],
+            [error_entry(1, 'a', 'b', meta={'missing': [1]}),
+             error_entry(2, 'c', 'd'),
+             {'field': 'detail', 'message': 'd'},
+             {'field': 'e', 'code': 3, 'message': 'f'},
+             {'code': 4, 'field': None}])
+        for errors in entries:
+            body = {'code': 1000, 'message': 'Zażółć\u2028\u2029',
+                    'errors': errors, 'truncated': True, 'total_errors': 5}
+            self.assertRendersLikeJSONRenderer(body)
+            with mock.patch.object(FriendlyJSONRenderer, 'ensure_ascii',
+                                   True), \
+                    mock.patch.object(JSONRenderer, 'ensure_ascii', True):
+                self.assertRendersLikeJSONRenderer(body)
+            with mock.patch.object(FriendlyJSONRenderer, 'compact', False), \
+                    mock.patch.object(JSONRenderer, 'compact', False):
+                self.assertRendersLikeJSONRenderer(body)
+
+    def test_view_errors_are_written_from_fragments(self):
+        rendered = []
+        render_entries = FriendlyJSONRenderer.render_entries
+
+        def spy(renderer, options, entries):
+            rendered.append(render_entries(renderer, options, entries))
+            return rendered[-1]
+
+        request = APIRequestFactory().post(reverse('api:snippet-list'),
+                                           data=self.data_set)
+        with mock.patch.object(FriendlyJSONRenderer, 'render_entries', spy):
+            response = SnippetList.as_view(
+                renderer_classes=[FriendlyJSONRenderer])(request)
+            response.render()
+        self.assertEqual(len(rendered), 1)
+        self.assertIsNotNone(rendered[0])
+        self.assertEqual(json.loads(response.content.decode()),
+                         json.loads(json.dumps(response.data)))
+
+    def test_other_data_and_indent(self):
+        self.assertRendersLikeJSONRenderer({'detail': 'Not found.'})
+        self.assertRendersLikeJSONRenderer(None)
+        self.assertRendersLikeJSONRenderer(self.errors,
+                                           'application/json; indent=4')
+
+    def test_constant_values_are_encoded_once(self):
+        FriendlyJSONRenderer().render(self.errors)
+        misses = _encode_value.cache_info().misses
+        FriendlyJSONRenderer().render(self.errors)
+        self.assertEqual(_encode_value.cache_info().misses, misses)
@@ -1,6 +1,14 @@
+from unittest import mock, skipIf
+
+from django.utils import translation
 from rest_framework import serializers
+from rest_framework.exceptions import ErrorDetail, ValidationError
 
+from rest_framework_friendly_errors import settings
 from rest_framework_friendly_errors.mixins import FriendlyErrorMessagesMixin
+from rest_framework_friendly_errors.serializers import (
+    HAS_RUN_CHILD_VALIDATION, FriendlyListSerializer
+)
 from rest_framework_friendly_errors.settings import (
     FRIENDLY_FIELD_ERRORS, VALIDATION_FAILED_CODE, VALIDATION_FAILED_MESSAGE
 )
@@ -8,8 +16,8 @@ from rest_framework_friendly_errors.settings import (
 from . import BaseTestCase
 from .serializers import (
     AnotherSnippetModelSerializer, FieldsErrorAsDictInValidateSerializer,
-    RegisterMultipleFieldsErrorSerializer, RegisterSingleFieldErrorSerializer,
-    SnippetSerializer, SnippetValidator
+    ItemSerializer, RegisterMultipleFieldsErrorSerializer,
+    RegisterSingleFieldErrorSerializer, SnippetSerializer, SnippetValidator
 )
 from .utils import run_is_valid
 
@@ -21,6 +29,89 @@ class SimpleSerializerClass(FriendlyErrorMessagesMixin,
     boolean_field = serializers.BooleanField(default=True)
 
 
+class CustomMessagesSerializerClass(FriendlyErrorMessagesMixin,
+                                    serializers.Serializer):
+    text_field = serializers.CharField(
+        max_length=5,
+        error_messages={'max_length': 'At most {max_length} characters!'})
+
+
+class UpperCharField(serializers.CharField):
+    pass
+
+
+class CustomFieldSerializerClass(FriendlyErrorMessagesMixin,
+                                 serializers.Serializer):
+    text_field = UpperCharField(max_length=5)
+
+
+class NestedSerializerClass(FriendlyErrorMessagesMixin,
+                            serializers.Serializer):
+    snippet = SnippetSerializer()
+    tags = serializers.ListField(child=serializers.IntegerField(),
+                                 required=False)
+
+
+class CountingValidator(object):
+    calls = 0
+
+    def __call__(self, value):
+        CountingValidator.calls += 1
+        raise ValidationError('Counted')
+
+
+class CountingValidatorSerializerClass(FriendlyErrorMessagesMixin,
+                                       serializers.Serializer):
+    text_field = serializers.CharField(validators=[CountingValidator()])
+
+    integer_field = serializers.IntegerField(required=False)
+
+    def validate_integer_field(self, value):
+        self.validate_calls = getattr(self, 'validate_calls', 0) + 1
+        raise ValidationError('Counted as well')
+
+    FIELD_VALIDATION_ERRORS = {'CountingValidator': 5002,
+                               'validate_integer_field': 5003}
+
+
+class FailFastSerializerClass(FriendlyErrorMessagesMixin,
+                              serializers.Serializer):
+    integer_field = serializers.IntegerField()
+    text_field = serializers.CharField(validators=[CountingValidator()])
+
+    FAIL_FAST_ERRORS = 1
+
+
+class CodedNonFieldErrorSerializerClass(FriendlyErrorMessagesMixin,
+                                        serializers.Serializer):
+    text_field = serializers.CharField()
+
+    def validate(self, attrs):
+        raise ValidationError(translation.gettext('Python required'),
+                              code='python_required')
+
+    NON_FIELD_ERRORS = {'python_required': 8001, 'Python required': 8002}
+
+
+class UnmappedNonFieldErrorSerializerClass(FriendlyErrorMessagesMixin,
+                                           serializers.Serializer):
+    text_field = serializers.CharField()
+
+    def validate(self, attrs):
+        raise ValidationError('Not mapped')
+
+
+class RegisteredNonFieldErrorsSerializerClass(FriendlyErrorMessagesMixin,
+                                              serializers.Serializer):
+    text_field = serializers.CharField()
+
+    def validate(self, attrs):
+        for index in range(50):
+            self.register_error('Error %d' % index, error_code=9000 + index,
+                                raise_validation_error=False)
+        raise ValidationError(self.registered_errors)
+
+
 class SanityTestCase(BaseTestCase):
 
     def test_serializer_valid(self):
@@ -56,6 +147,20 @@ class SerializerErrorsTestCase(BaseTestCase):
         self.assertTrue(s.errors)
         self.assertTrue(type(s.errors), dict)
 
+    def test_errors_are_built_once_per_validation(self):
+        self.data_set['linenos'] = 'A text instead of a bool'
+        s = run_is_valid(SnippetSerializer, data=self.data_set)
+        self.assertIs(s.errors, s.errors)
+
+        errors = s.errors
+        self.data_set['linenos'] = True
+        self.data_set['title'] = ''
+        s.initial_data = self.data_set
+        del s._validated_data
+        s.is_valid()
+        self.assertIsNot(s.errors, errors)
+        self.assertEqual(s.errors['errors'][0]['field'], 'title')
+
     def test_error_message_content(self):
         self.data_set['linenos'] = 'A text instead of a bool'
         s = run_is_valid(SnippetSerializer, data=self.data_set)
@@ -147,6 +252,32 @@ class SerializerErrorsTestCase(BaseTestCase):
         self.assertEqual(s.errors['errors'][0]['code'], code)
         self.assertEqual(s.errors['errors'][0]['field'], 'posted_date')
 
+    def test_custom_error_message_resolved_by_code(self):
+        s = run_is_valid(CustomMessagesSerializerClass,
+                         data={'text_field': 'Too long'})
+        code = FRIENDLY_FIELD_ERRORS['CharField']['max_length']
+        self.assertEqual(s.errors['errors'][0]['code'], code)
+        self.assertEqual(s.errors['errors'][0]['message'],
+                         'At most 5 characters!')
+
+    def test_plain_string_error_resolved_by_template(self):
+        s = run_is_valid(SnippetSerializer, data=self.data_set)
+        message = 'Ensure this field has no more than 10 characters.'
+        with translation.override('en'):
+            pretty = s.build_pretty_errors({'title': [message]})
+        code = FRIENDLY_FIELD_ERRORS['CharField']['max_length']
+        self.assertEqual(pretty['errors'][0]['code'], code)
+
+    def test_field_subclass_inherits_error_codes(self):
+        s = run_is_valid(CustomFieldSerializerClass,
+                         data={'text_field': 'Too long'})
+        code = FRIENDLY_FIELD_ERRORS['CharField']['max_length']
+        self.assertEqual(s.errors['errors'][0]['code'], code)
+
+        s = run_is_valid(CustomFieldSerializerClass, data={'text_field': ''})
+        code = FRIENDLY_FIELD_ERRORS['CharField']['blank']
+        self.assertEqual(s.errors['errors'][0]['code'], code)
+
     def test_custom_field_validation_method(self):
         self.data_set['comment'] = 'comment'
         s = run_is_valid(SnippetSerializer, data=self.data_set)
@@ -159,6 +290,34 @@ class SerializerErrorsTestCase(BaseTestCase):
         self.assertEqual(s.errors['errors'][0]['field'], 'title')
         self.assertEqual(s.errors['errors'][0]['code'], 5001)
 
+    def test_failed_validator_is_not_run_again(self):
+        CountingValidator.calls = 0
+        s = run_is_valid(CountingValidatorSerializerClass,
+                         data={'text_field': 'text'})
+        self.assertEqual(s.errors['errors'][0]['code'], 5002)
+        self.assertEqual(CountingValidator.calls, 1)
+
+    def test_failed_validate_method_is_not_run_again(self):
+        s = run_is_valid(CountingValidatorSerializerClass,
+                         data={'text_field': 'text', 'integer_field': 1})
+        errors = {e['field']: e['code'] for e in s.errors['errors']}
+        self.assertEqual(errors['integer_field'], 5003)
+        self.assertEqual(s.validate_calls, 1)
+
+    def test_field_validation_errors_are_merged_along_mro(self):
+        self.data_set['comment'] = 'comment'
+        s = run_is_valid(FieldsErrorAsDictInValidateSerializer,
+                         data=self.data_set)
+        self.assertEqual(s.errors['errors'][0]['field'], 'comment')
+        self.assertEqual(s.errors['errors'][0]['code'], 5000)
+
+    def test_error_code_table_is_shared_by_instances(self):
+        table = SnippetSerializer.get_error_code_table()
+        self.assertIs(SnippetSerializer().get_error_code_table(), table)
+        self.assertIsNot(
+            FieldsErrorAsDictInValidateSerializer.get_error_code_table(),
+            table)
+
     def test_field_dependency_validation(self):
         self.data_set['title'] = 'A Python'
         self.data_set['language'] = 'c++'
@@ -277,3 +436,186 @@ class SerializerErrorsTestCase(BaseTestCase):
         self.assertIsNotNone(errors)
         self.assertEqual(type(errors), list)
         self.assertEqual(errors[0]['code'], code)
+
+
+class ListSerializerErrorsTestCase(BaseTestCase):
+
+    def test_many_uses_friendly_list_serializer(self):
+        s = SnippetSerializer(data=[self.data_set], many=True)
+        self.assertIsInstance(s, FriendlyListSerializer)
+        self.assertTrue(s.is_valid())
+
+    def test_item_index_in_field_path(self):
+        invalid = dict(self.data_set, linenos='A text instead of a bool')
+        s = SnippetSerializer(data=[self.data_set, invalid, invalid],
+                              many=True)
+        self.assertFalse(s.is_valid())
+        code = FRIENDLY_FIELD_ERRORS['BooleanField']['invalid']
+        self.assertEqual(s.errors['code'], VALIDATION_FAILED_CODE)
+        self.assertEqual([(e['field'], e['code']) for e in s.errors['errors']],
+                         [('/1/linenos', code), ('/2/linenos', code)])
+
+    def test_identical_item_errors_are_resolved_once(self):
+        invalid = dict(self.data_set, linenos='A text instead of a bool')
+        s = SnippetSerializer(data=[invalid] * 5, many=True)
+        s.is_valid()
+        with mock.patch.object(s.child, 'get_field_error_entry',
+                               wraps=s.child.get_field_error_entry) as get:
+            self.assertEqual(len(s.errors['errors']), 5)
+        self.assertEqual(get.call_count, 1)
+
+    def test_validation_state_is_kept_per_item(self):
+        s = ItemSerializer(data=[{'n': 0}, {'n': -1}, {'n': 2},
+                                 {'n': 101}, {'n': 1}, {'n': 3}], many=True)
+        self.assertFalse(s.is_valid())
+        self.assertEqual([(e['field'], e['code']) for e in s.errors['errors']],
+                         [('/0/n', 7000), ('/1/n', 5010), ('/2/n', 7000),
+                          ('/3/n', 5011), ('/4', 7001)])
+
+    def test_wrappers_are_installed_once(self):
+        s = SnippetSerializer(data=[self.data_set] * 3, many=True)
+        self.assertTrue(s.is_valid())
+        run_validators = s.child.fields['title'].run_validators
+        s.child.run_validation(self.data_set)
+        self.assertIs(s.child.fields['title'].run_validators, run_validators)
+
+    @skipIf(not HAS_RUN_CHILD_VALIDATION,
+            'run_child_validation needs DRF 3.15')
+    def test_items_are_validated_through_run_child_validation(self):
+        s = SnippetSerializer(data=[self.data_set] * 2, many=True)
+        self.assertTrue(s.is_valid())
+        self.assertNotIn('run_validation', s.child.__dict__)
+        self.assertEqual(s.item_states, [None, None])
+
+    def test_payload_which_is_not_a_list(self):
+        s = SnippetSerializer(data=self.data_set, many=True)
+        self.assertFalse(s.is_valid())
+        self.assertIsNone(s.errors['errors'][0]['field'])
+
+
+class NestedErrorsTestCase(BaseTestCase):
+
+    def test_nested_serializer_errors(self):
+        self.data_set['comment'] = 'comment'
+        s = run_is_valid(NestedSerializerClass,
+                         data={'snippet': self.data_set})
+        errors = s.errors['errors']
+        self.assertEqual(errors[0]['field'], '/snippet/comment')
+        self.assertEqual(errors[0]['code'], 5000)
+
+    def test_list_field_child_errors(self):
+        s = run_is_valid(NestedSerializerClass,
+                         data={'snippet': self.data_set, 'tags': [1, 'x']})
+        errors = s.errors['errors']
+        code = FRIENDLY_FIELD_ERRORS['IntegerField']['invalid']
+        self.assertEqual(errors[0]['field'], '/tags/1')
+        self.assertEqual(errors[0]['code'], code)
+
+    def test_deeply_nested_errors(self):
+        depth = 1500
+        field = serializers.IntegerField()
+        for _ in range(depth):
+            field = serializers.ListField(child=field)
+        s = run_is_valid(NestedSerializerClass,
+                         data={'snippet': self.data_set})
+        s.fields['deep'] = field
+        errors = [ErrorDetail('Invalid', code='invalid')]
+        for _ in range(depth):
+            errors = {0: errors}
+        pretty = s.build_pretty_errors({'deep': errors})
+        code = FRIENDLY_FIELD_ERRORS['IntegerField']['invalid']
+        self.assertEqual(pretty['errors'][0]['code'], code)
+        self.assertEqual(pretty['errors'][0]['field'],
+                         '/deep' + '/0' * depth)
+
+
+class MaxErrorsTestCase(BaseTestCase):
+
+    def setUp(self):
+        super(MaxErrorsTestCase, self).setUp()
+        self.data_set.update({'linenos': 'A text instead of a bool',
+                              'rating': 'text instead of float',
+                              'posted_date': 'text instead of date'})
+
+    def test_errors_are_yielded_lazily(self):
+        s = run_is_valid(SnippetSerializer, data=self.data_set)
+        entries = s.iter_pretty_errors(s._errors)
+        self.assertEqual(next(entries)['field'], 'linenos')
+
+    def test_errors_are_capped(self):
+        s = run_is_valid(SnippetSerializer, data=self.data_set)
+        with mock.patch.object(settings.friendly_settings, 'MAX_ERRORS', 2):
+            errors = s.errors
+        self.assertEqual(len(errors['errors']), 2)
+        self.assertTrue(errors['truncated'])
+        self.assertEqual(errors['total_errors'], 3)
+
+    def test_errors_below_cap_are_not_truncated(self):
+        s = run_is_valid(SnippetSerializer, data=self.data_set)
+        with mock.patch.object(settings.friendly_settings, 'MAX_ERRORS', 3):
+            errors = s.errors
+        self.assertEqual(len(errors['errors']), 3)
+        self.assertNotIn('truncated', errors)
+
+
+class FailFastTestCase(BaseTestCase):
+
+    def test_validation_stops_after_limit(self):
+        calls = CountingValidator.calls
+        s = run_is_valid(FailFastSerializerClass,
+                         data={'integer_field': 'x', 'text_field': 'a'})
+        self.assertEqual(CountingValidator.calls, calls)
+        errors = s.errors['errors']
+        self.assertEqual([e['field'] for e in errors], ['integer_field'])
+
+    def test_whole_payload_is_validated_by_default(self):
+        s = run_is_valid(SimpleSerializerClass,
+                         data={'text_field': 'x' * 256,
+                               'integer_field': 'x'})
+        self.assertEqual(len(s.errors['errors']), 2)
+
+    def test_list_validation_stops_after_limit(self):
+        invalid = dict(self.data_set, linenos='A text instead of a bool')
+        s = SnippetSerializer(data=[invalid] * 5, many=True)
+        with mock.patch.object(settings.friendly_settings,
+                               'FAIL_FAST_ERRORS', 2):
+            self.assertFalse(s.is_valid())
+        self.assertEqual(len(s._errors), 2)
+        self.assertEqual([e['field'] for e in s.errors['errors']],
+                         ['/0/linenos', '/1/linenos'])
+
+
+class NonFieldErrorsTestCase(BaseTestCase):
+
+    def test_code_is_used_before_message(self):
+        s = run_is_valid(CodedNonFieldErrorSerializerClass,
+                         data={'text_field': 'text'})
+        self.assertEqual(s.errors['errors'][0]['code'], 8001)
+
+    def test_code_survives_translated_message(self):
+        with mock.patch.object(translation, 'gettext',
+                               return_value='Python wymagany'):
+            s = run_is_valid(CodedNonFieldErrorSerializerClass,
+                             data={'text_field': 'text'})
+        self.assertEqual(s.errors['errors'][0]['message'], 'Python wymagany')
+        self.assertEqual(s.errors['errors'][0]['code'], 8001)
+
+    def test_generic_code_does_not_override_message_key(self):
+        self.data_set.update({'title': 'A Python', 'language': 'c++'})
+        s = run_is_valid(SnippetSerializer, data=self.data_set)
+        self.assertEqual(s.errors['errors'][0]['code'], 8000)
+
+    def test_unmapped_error_keeps_generic_code(self):
+        s = run_is_valid(UnmappedNonFieldErrorSerializerClass,
+                         data={'text_field': 'text'})
+        self.assertEqual(s.errors['errors'][0]['code'],
+                         ValidationError.default_code)
+
+    def test_registered_errors_are_indexed(self):
+        s = run_is_valid(RegisteredNonFieldErrorsSerializerClass,
+                         data={'text_field': 'text'})
+        self.assertEqual(len(s.registered_non_field_errors), 50)
+        errors = s.errors['errors']
+        self.assertEqual([e['code'] for e in errors],
+                         [9000 + index for index in range(50)])
+        self.assertEqual(errors[7]['message'], 'Error 7')
@@ -0,0 +1,47 @@
+from django.test import override_settings
+from rest_framework.exceptions import NotFound
+
+from rest_framework_friendly_errors import settings
+from rest_framework_friendly_errors.codes import get_exception_code
+from rest_framework_friendly_errors.settings import DEFAULT_FIELD_ERRORS
+
+from . import BaseTestCase
+from .serializers import SnippetSerializer
+from .utils import run_is_valid
+
+
+class SettingsTestCase(BaseTestCase):
+
+    def test_defaults(self):
+        self.assertEqual(settings.VALIDATION_FAILED_CODE, 1000)
+        self.assertIsNone(settings.MAX_ERRORS)
+        self.assertEqual(settings.FRIENDLY_FIELD_ERRORS['CharField'],
+                         DEFAULT_FIELD_ERRORS['CharField'])
+
+    def test_loaded_settings_are_attributes(self):
+        friendly_settings = settings.friendly_settings
+        friendly_settings.MAX_ERRORS
+        self.assertIn('MAX_ERRORS', vars(friendly_settings))
+        with override_settings(FRIENDLY_ERRORS={'MAX_ERRORS': 5}):
+            self.assertNotIn('MAX_ERRORS', vars(friendly_settings))
+            self.assertEqual(friendly_settings.MAX_ERRORS, 5)
+
+    def test_invalid_setting(self):
+        with self.assertRaises(AttributeError):
+            settings.friendly_settings.NOT_A_SETTING
+
+    def test_override_settings_rebuilds_tables(self):
+        user_settings = {'FIELD_ERRORS': {'BooleanField': {'invalid': 10}},
+                         'EXCEPTION_DICT': {'NotFound': 20},
+                         'VALIDATION_FAILED_CODE': 30}
+        with override_settings(FRIENDLY_ERRORS=user_settings):
+            self.assertEqual(settings.VALIDATION_FAILED_CODE, 30)
+            self.assertEqual(get_exception_code(NotFound), 20)
+            self.data_set['linenos'] = 'A text instead of a bool'
+            s = run_is_valid(SnippetSerializer, data=self.data_set)
+            self.assertEqual(s.errors['code'], 30)
+            self.assertEqual(s.errors['errors'][0]['code'], 10)
+        self.assertEqual(settings.VALIDATION_FAILED_CODE, 1000)
+        self.assertEqual(get_exception_code(NotFound), 4004)
+        self.assertEqual(DEFAULT_FIELD_ERRORS['BooleanField']['invalid'],
+                         2011)
@@ -1,6 +1,8 @@
 from unittest import TestCase
 
-from rest_framework_friendly_errors.utils import update_field_settings
+from rest_framework_friendly_errors.utils import (
+    is_friendly, matches_template, update_field_settings
+)
 
 
 class UpdateFieldSettingTestCase(TestCase):
@@ -42,3 +44,34 @@ class UpdateFieldSettingTestCase(TestCase):
         self.assertEqual(setting['CharField']['max_length'], 2005)
         self.assertEqual(setting['EmailField']['max_length'], 2005)
         self.assertEqual(setting['CustomField']['null'], 12)
+
+
+class MatchesTemplateTestCase(TestCase):
+
+    def test_template_without_placeholders(self):
+        self.assertTrue(matches_template('Not a valid string.',
+                                         'Not a valid string.'))
+        self.assertFalse(matches_template('Not a valid string.',
+                                          'Incorrect title'))
+
+    def test_template_with_placeholders(self):
+        template = 'Ensure this field has no more than {max_length} characters.'
+        self.assertTrue(matches_template(
+            template, 'Ensure this field has no more than 10 characters.'))
+        self.assertFalse(matches_template(template, 'Incorrect title'))
+
+
+class IsFriendlyTestCase(TestCase):
+
+    def test_friendly_body(self):
+        self.assertTrue(is_friendly({'code': 1000, 'message': 'Failed',
+                                     'errors': []}))
+        self.assertTrue(is_friendly({'code': 1000, 'errors': []}))
+
+    def test_drf_bodies(self):
+        self.assertFalse(is_friendly({'detail': 'Not found.'}))
+        self.assertFalse(is_friendly({'code': ['Invalid'],
+                                      'message': ['Required']}))
+        self.assertFalse(is_friendly({'code': ['Invalid'],
+                                      'errors': ['Required']}))
+        self.assertFalse(is_friendly(['Invalid']))